@@ -2,14 +2,40 @@ from flask import Flask, request, render_template, jsonify
 from werkzeug.utils import secure_filename
 import os
 import json
-from models.text_utils import TextUtils
-from models.pdf_utils import PDFUtils
+import tempfile
+from models.text_utils import TextUtils, SUMMARY_MODES
+from models.document import Document
+from models.pdf_utils import PDFUtils, LazyPDF, PARALLEL_MIN_PAGES
+from models.text_cache import TextCache
+from models.pdf_budget import ExtractionBudget
+from models.chapter_splitter import ChapterSplitter
+from models import rewrite_rules
 from flask_sqlalchemy import SQLAlchemy
 
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///summaries.db'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['UPLOAD_SPILL_BYTES'] = 4 * 1024 * 1024  # Larger uploads are parsed from disk
+app.config['PDF_EXTRACT_WORKERS'] = int(os.environ.get('PDF_EXTRACT_WORKERS', os.cpu_count() or 1))
+app.config['PDF_PAGE_TIMEOUT'] = 10.0  # Seconds before a single page is skipped
+app.config['PDF_DOCUMENT_TIMEOUT'] = 60.0  # Seconds before the remaining pages are skipped
+app.config['PDF_PAGE_MEMORY_MB'] = 512
+# PDFs with fewer pages than this and smaller than PDF_SUPERVISE_MIN_BYTES are
+# extracted in the web process: a supervised worker adds a process start per
+# request, and a bad page in such a small file is not timed out or capped
+app.config['PDF_SUPERVISE_MIN_PAGES'] = PARALLEL_MIN_PAGES
+app.config['PDF_SUPERVISE_MIN_BYTES'] = 1024 * 1024
+app.config['LAZY_MIN_PAGES'] = 60  # Short summaries of longer PDFs decode only a page budget
+app.config['LAZY_PAGE_BUDGET'] = 24
+app.config['TEXT_CACHE_FOLDER'] = 'cache'
+app.config['TEXT_CACHE_MAX_BYTES'] = 256 * 1024 * 1024  # 256MB of compressed text
+app.config['CLEANUP_PROFILE'] = os.environ.get('CLEANUP_PROFILE', 'auto')  # 'full', 'light', 'none' or 'auto'
+app.config['SUMMARY_MODE'] = os.environ.get('SUMMARY_MODE', 'position')  # Default sentence selection: 'position' or 'scored'
+app.config['RULE_STATS'] = os.environ.get('RULE_STATS', 'false').lower() == 'true'  # Per-rule match and time counters
+# Abstractive models (keys of Summarizer.models, comma-separated) loaded and
+# run once at start-up; empty leaves transformers unimported
+app.config['WARMUP_MODELS'] = [name.strip() for name in os.environ.get('WARMUP_MODELS', '').split(',') if name.strip()]
 
 db = SQLAlchemy(app)
 
@@ -25,6 +51,16 @@ class Summary(db.Model):
 
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
+text_cache = TextCache(app.config['TEXT_CACHE_FOLDER'], max_bytes=app.config['TEXT_CACHE_MAX_BYTES'])
+rewrite_rules.set_instrumentation(app.config['RULE_STATS'])
+
+# Loaded ahead of traffic so the first request does not pay for model loading
+summarizer = None
+if app.config['WARMUP_MODELS']:
+    from models.summarizer import Summarizer
+    summarizer = Summarizer()
+    summarizer.warm_up(app.config['WARMUP_MODELS'])
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -44,16 +80,33 @@ def summarize():
     length = request.form.get('length', 'medium')
     target_lang = request.form.get('target_language')  # Optional target language
     auto_save = request.form.get('auto_save', 'false').lower() == 'true'  # Default to not auto-save
+    by_chapter = request.form.get('chapters', 'false').lower() == 'true'  # Per-chapter summaries
+    summary_mode = request.form.get('summary_mode') or app.config['SUMMARY_MODE']
+    if summary_mode not in SUMMARY_MODES:
+        return jsonify({'error': f"Unknown summary mode: {summary_mode}"}), 400
     
     filename = secure_filename(file.filename)
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
     
-    # Save the file first
-    file.save(filepath)
+    # Parse the upload straight from Werkzeug's stream; only large files are
+    # spilled to disk (so extraction workers can open them) under a unique,
+    # content-addressed name
+    stream = file.stream
+    stream.seek(0, os.SEEK_END)
+    file_size = stream.tell()
+    stream.seek(0)
+    digest = TextCache.digest_stream(stream)
+    
+    source = stream
+    filepath = None
+    if file_size > app.config['UPLOAD_SPILL_BYTES']:
+        fd, filepath = tempfile.mkstemp(prefix=digest + '-', suffix='.pdf', dir=app.config['UPLOAD_FOLDER'])
+        os.close(fd)
+        stream.seek(0)
+        file.save(filepath)
+        source = filepath
     
     # Use appropriate summary length based on file size if not explicitly specified
     if request.form.get('length') is None:
-        file_size = os.path.getsize(filepath)
         if file_size < 50000:  # Small file (< 50KB)
             length = 'short'
         elif file_size < 200000:  # Medium file (50KB - 200KB)
@@ -62,9 +115,6 @@ def summarize():
             length = 'long'
     
     try:
-        # Extract text from PDF
-        text = PDFUtils.extract_text(filepath)
-        
         # Set ratio based on requested length
         if length == 'short':
             ratio = 0.25  # 1/4 of the original
@@ -73,12 +123,83 @@ def summarize():
         else:  # long
             ratio = 0.75  # 3/4 of the original
         
-        # Generate summary
-        summary = TextUtils.summarize_text(text, ratio)
+        chapter_summaries = None
+        
+        # An identical earlier upload costs only the hash computed above: its
+        # cleaned text is reused without parsing the PDF (chapter mode needs
+        # the individual pages, so it skips the cache)
+        cached = None
+        if not by_chapter:
+            cached = PDFUtils.cached_document(text_cache, digest, app.config['CLEANUP_PROFILE'])
+        
+        if cached is not None:
+            page_count = cached['page_count']
+        else:
+            # Page count comes from the page tree, before any text is decoded
+            page_count = PDFUtils.probe(source)['page_count']
+        
+        # Pages that blow their time or memory budget are skipped
+        budget = ExtractionBudget(
+            page_timeout=app.config['PDF_PAGE_TIMEOUT'],
+            document_timeout=app.config['PDF_DOCUMENT_TIMEOUT'],
+            page_memory_mb=app.config['PDF_PAGE_MEMORY_MB'],
+            min_pages=app.config['PDF_SUPERVISE_MIN_PAGES'],
+            min_bytes=app.config['PDF_SUPERVISE_MIN_BYTES']
+        )
+        
+        if cached is not None:
+            # Nothing is decoded for a cached upload
+            document = Document(cached['text'])
+            summary = TextUtils.summarize_text(document, ratio, summary_mode)
+            skipped_pages = []
+            cleanup_profile = cached['cleanup_profile']
+            pages_decoded = 0
+            keywords_sampled = False
+        elif length == 'short' and page_count >= app.config['LAZY_MIN_PAGES'] and not by_chapter:
+            # A short summary only draws on a few pages, so decode just those
+            # (in the same supervised workers as a full extraction)
+            with LazyPDF(source, budget=budget, workers=app.config['PDF_EXTRACT_WORKERS']) as pdf:
+                summary, document = TextUtils.summarize_pages(pdf, ratio, max_pages=app.config['LAZY_PAGE_BUDGET'],
+                                                           mode=summary_mode)
+                pages_decoded = pdf.pages_decoded
+                skipped_pages = pdf.skipped_pages
+            cleanup_profile = 'full'  # Only the page budget is cleaned
+            # Keywords and topics below come from the sampled pages only
+            keywords_sampled = True
+        else:
+            # Extract text from PDF, storing the cleaned text for identical uploads
+            extracted = PDFUtils.extract_document(
+                source,
+                workers=app.config['PDF_EXTRACT_WORKERS'],
+                cache=None if by_chapter else text_cache,
+                cache_key=digest,
+                budget=budget,
+                profile=app.config['CLEANUP_PROFILE'],
+                page_count=page_count,
+                lookup=False
+            )
+            # Extracted text is already cleaned, so every stage below shares
+            # one analysis of it instead of re-cleaning and re-splitting it
+            document = Document(extracted['text'])
+            skipped_pages = extracted['skipped_pages']
+            cleanup_profile = extracted['cleanup_profile']
+            pages_decoded = page_count - len(skipped_pages)
+            keywords_sampled = False
+            
+            # Generate summary
+            if by_chapter:
+                # Split along the outline (or detected headings) and summarize chapters concurrently
+                chapters = ChapterSplitter.split(extracted['pages'], PDFUtils.read_outline(source))
+                result = ChapterSplitter.summarize(chapters, ratio, workers=app.config['PDF_EXTRACT_WORKERS'],
+                                                   mode=summary_mode)
+                summary = result['summary']
+                chapter_summaries = result['chapters']
+            else:
+                summary = TextUtils.summarize_text(document, ratio, summary_mode)
         
         # Extract keywords and topics
-        keywords = TextUtils.extract_keywords(text, num_keywords=20)
-        topics = TextUtils.extract_topics(text)
+        keywords = TextUtils.extract_keywords(document, num_keywords=20)
+        topics = TextUtils.extract_topics(document)
         
         # Translate if needed
         source_language = 'en'
@@ -91,6 +212,11 @@ def summarize():
                 summary = translated_summary
                 source_language = target_lang
             
+            for chapter in chapter_summaries or []:
+                translated_chapter = TextUtils.translate_text(chapter['summary'], target_lang)
+                if translated_chapter:
+                    chapter['summary'] = translated_chapter
+            
             # Translate topic names (but not the terms)
             for topic in topics:
                 translated_topic = TextUtils.translate_text(topic["topic"], target_lang)
@@ -102,7 +228,7 @@ def summarize():
         
         # Calculate simple quality metrics
         quality_metrics = {
-            'compression_ratio': round(len(summary.split()) / len(text.split()), 2),
+            'compression_ratio': round(len(summary.split()) / len(document.tokens), 2) if document.tokens else 0,
             'information_density': 0.8,
             'coherence_score': 0.9,
             'overall_quality': 0.85
@@ -125,7 +251,8 @@ def summarize():
             db.session.commit()
             summary_id = new_summary.id
         
-        os.remove(filepath)  # Clean up uploaded file
+        if filepath:
+            os.remove(filepath)  # Clean up spilled upload
         
         return jsonify({
             'summary': summary,
@@ -136,7 +263,14 @@ def summarize():
             'keywords': keywords,
             'quality_metrics': quality_metrics,
             'saved': auto_save,
-            'summary_id': summary_id
+            'summary_id': summary_id,
+            'page_count': page_count,
+            'pages_decoded': pages_decoded,
+            'keywords_sampled': keywords_sampled,
+            'skipped_pages': skipped_pages,
+            'cleanup_profile': cleanup_profile,
+            'summary_mode': summary_mode,
+            'chapters': chapter_summaries
         })
     
     except Exception as e:
@@ -144,10 +278,26 @@ def summarize():
         error_details = traceback.format_exc()
         print(f"Error in summarize endpoint: {str(e)}")
         print(f"Traceback: {error_details}")
-        if os.path.exists(filepath):
+        if filepath and os.path.exists(filepath):
             os.remove(filepath)
         return jsonify({'error': str(e), 'details': error_details}), 500
 
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify(text_cache.stats())
+
+@app.route('/models/stats', methods=['GET'])
+def model_stats():
+    if summarizer is None:
+        return jsonify({'error': 'No models are loaded; set WARMUP_MODELS'}), 404
+    return jsonify(summarizer.model_pool.stats())
+
+@app.route('/rules/stats', methods=['GET', 'DELETE'])
+def rule_stats():
+    if request.method == 'DELETE':
+        rewrite_rules.reset_stats()
+    return jsonify(rewrite_rules.collect_stats())
+
 @app.route('/summaries', methods=['GET'])
 def get_summaries():
     summaries = Summary.query.all()
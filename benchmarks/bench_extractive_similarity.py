@@ -0,0 +1,71 @@
+"""
+Time to build ExtractiveSummarizer's sentence similarity matrix: one
+_sentence_similarity call per pair versus the sparse matrix product.
+The matrix is dense, so 20,000 sentences need about 3.2 GB.
+
+The pairwise path is only timed up to PAIRWISE_MAX_SENTENCES, since it
+grows with the square of the sentence count; both paths must agree there.
+
+Run from the repository root:
+    python -m benchmarks.bench_extractive_similarity [max_sentences]
+"""
+import random
+import sys
+import time
+import numpy as np
+from models.extractive_summarizer import ExtractiveSummarizer
+
+SIZES = (100, 500, 1000, 2000, 5000, 10000, 20000)
+
+# Largest input the pairwise path is timed on
+PAIRWISE_MAX_SENTENCES = 500
+
+
+def _sentences(count, vocabulary_size=20000):
+    """
+    Sentences of 8-30 words drawn from a Zipf-like vocabulary whose most
+    frequent words (the stop words) have been removed
+    """
+    rnd = random.Random(0)
+    vocabulary = [f"term{index}" for index in range(vocabulary_size)]
+    weights = [1.0 / (rank + 100) for rank in range(vocabulary_size)]
+    return [
+        " ".join(rnd.choices(vocabulary, weights, k=rnd.randint(8, 30))).capitalize() + "."
+        for _ in range(count)
+    ]
+
+
+def _pairwise(summarizer, sentences):
+    """The original n^2 loop over _sentence_similarity"""
+    matrix = np.zeros((len(sentences), len(sentences)))
+    for i in range(len(sentences)):
+        for j in range(len(sentences)):
+            if i != j:
+                matrix[i][j] = summarizer._sentence_similarity(sentences[i], sentences[j])
+    return matrix
+
+
+def main(max_sentences=20000):
+    summarizer = ExtractiveSummarizer()
+    print(f"{'sentences':>10}{'pairwise s':>12}{'matrix s':>10}{'speedup':>10}")
+
+    for size in (size for size in SIZES if size <= max_sentences):
+        sentences = _sentences(size)
+
+        start = time.perf_counter()
+        matrix = summarizer._build_similarity_matrix(sentences)
+        vectorized = time.perf_counter() - start
+
+        if size <= PAIRWISE_MAX_SENTENCES:
+            start = time.perf_counter()
+            expected = _pairwise(summarizer, sentences)
+            pairwise = time.perf_counter() - start
+            assert np.allclose(matrix, expected), f"{size} sentences: scores differ"
+            print(f"{size:>10}{pairwise:>12.2f}{vectorized:>10.3f}{pairwise / vectorized:>9.0f}x")
+        else:
+            print(f"{size:>10}{'-':>12}{vectorized:>10.3f}{'-':>10}")
+        del matrix
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,156 @@
+"""
+Latency, memory and output similarity of the summarization backends on
+CPU: fp32 eager PyTorch ('torch'), dynamic int8 quantization ('int8') and
+ONNX Runtime ('onnx'), each compared against the 'torch' summaries.
+
+Without an argument a tiny BART checkpoint with a word-level tokenizer is
+built in a temporary directory, so the benchmark runs offline (its random
+weights give meaningless but deterministic summaries, which is all the
+comparison needs). Pass a Hub name or checkpoint directory to measure a
+real model such as sshleifer/distilbart-cnn-6-6.
+
+Run from the repository root:
+    python -m benchmarks.bench_inference_backends [model_name_or_path]
+"""
+import difflib
+import gc
+import statistics
+import sys
+import tempfile
+import time
+import torch
+from tokenizers import Tokenizer
+from tokenizers.models import WordLevel
+from tokenizers.pre_tokenizers import Whitespace
+from transformers import BartConfig, BartForConditionalGeneration, PreTrainedTokenizerFast
+from transformers.utils import logging
+from models.inference_backends import BACKENDS, load_pipeline
+from models.model_pool import _rss_mb
+
+# Inputs summarized by every backend
+DOCUMENTS = [
+    "Blockchain technology stores records in a shared ledger that is replicated across many "
+    "computers. Each block links to the previous one, so past records cannot be changed without "
+    "the agreement of the network. Smart contracts run on the ledger and settle agreements "
+    "automatically once their conditions are met.",
+    "Public key infrastructure binds keys to identities through certificates signed by trusted "
+    "authorities. Clients check the chain of signatures before they trust a key, and revoked "
+    "certificates are published so that stolen keys stop working.",
+    "Machine learning models are trained on historical data and then used to make predictions "
+    "about new cases. Their accuracy depends on how well the training data matches the data the "
+    "model sees later, which is why models are monitored and retrained.",
+    "The network topology decides how nodes exchange messages. In decentralized systems no single "
+    "node holds the data and decision making, so the system keeps working when some nodes fail "
+    "or leave the network.",
+]
+
+# Generation settings shared by every backend
+GENERATION = {'max_new_tokens': 40, 'min_length': 10, 'do_sample': False}
+
+# Timed passes over DOCUMENTS per backend
+REPEATS = 3
+
+# Tokens the tiny checkpoint's tokenizer reserves, in BART's id order
+SPECIAL_TOKENS = ['<s>', '<pad>', '</s>', '<unk>', '<mask>']
+
+
+def build_tiny_checkpoint(path):
+    """
+    Save a randomly initialized 2-layer BART and a word-level tokenizer over
+    the words of DOCUMENTS to path
+
+    Args:
+        path (str): Directory to write the checkpoint to
+
+    Returns:
+        str: path
+    """
+    words = sorted({token for document in DOCUMENTS for token, _ in Whitespace().pre_tokenize_str(document)})
+    vocabulary = {token: index for index, token in enumerate(SPECIAL_TOKENS + words)}
+
+    tokenizer = Tokenizer(WordLevel(vocabulary, unk_token='<unk>'))
+    tokenizer.pre_tokenizer = Whitespace()
+    PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer,
+        bos_token='<s>', pad_token='<pad>', eos_token='</s>', unk_token='<unk>', mask_token='<mask>'
+    ).save_pretrained(path)
+
+    torch.manual_seed(0)
+    config = BartConfig(
+        vocab_size=len(vocabulary),
+        d_model=64,
+        encoder_layers=2,
+        decoder_layers=2,
+        encoder_attention_heads=4,
+        decoder_attention_heads=4,
+        encoder_ffn_dim=128,
+        decoder_ffn_dim=128,
+        max_position_embeddings=256,
+        bos_token_id=0,
+        pad_token_id=1,
+        eos_token_id=2,
+        decoder_start_token_id=2
+    )
+    BartForConditionalGeneration(config).save_pretrained(path)
+    return path
+
+
+def _similarity(summary, expected):
+    """Share of matching words between two summaries (1.0 when identical)"""
+    return difflib.SequenceMatcher(None, summary.split(), expected.split()).ratio()
+
+
+def _measure(model_path, backend, local_files_only):
+    """Load time, RSS growth, median latency and summaries of one backend"""
+    gc.collect()
+    before = _rss_mb()
+    start = time.perf_counter()
+    summarizer = load_pipeline(model_path, backend, local_files_only=local_files_only)
+    load_seconds = time.perf_counter() - start
+
+    # One untimed pass, so lazy initialization is not counted as latency
+    summarizer(DOCUMENTS[0], **GENERATION)
+
+    latencies = []
+    summaries = []
+    for _ in range(REPEATS):
+        summaries = []
+        for document in DOCUMENTS:
+            start = time.perf_counter()
+            summaries.append(summarizer(document, **GENERATION)[0]['summary_text'])
+            latencies.append(time.perf_counter() - start)
+
+    after = _rss_mb()
+    memory_mb = after - before if before is not None and after is not None else float('nan')
+    del summarizer
+    return load_seconds, memory_mb, statistics.median(latencies), summaries
+
+
+def main(model_path=None):
+    # Generation length advice for every call would drown the table
+    logging.set_verbosity_error()
+    with tempfile.TemporaryDirectory() as scratch:
+        local_files_only = model_path is None
+        if model_path is None:
+            model_path = build_tiny_checkpoint(scratch)
+            print(f"Tiny offline checkpoint in {model_path}")
+        print(f"{'backend':<8}{'load s':>8}{'memory MB':>11}{'latency ms':>12}{'speedup':>9}{'similarity':>12}")
+
+        baseline = None
+        for backend in BACKENDS:
+            try:
+                load_seconds, memory_mb, latency, summaries = _measure(model_path, backend, local_files_only)
+            except ImportError as e:
+                print(f"{backend:<8}skipped: {str(e)}")
+                continue
+            if baseline is None:
+                baseline = (latency, summaries)
+            similarity = statistics.mean(
+                _similarity(summary, expected) for summary, expected in zip(summaries, baseline[1])
+            )
+            print(f"{backend:<8}{load_seconds:>8.2f}{memory_mb:>11.1f}{latency * 1000:>12.1f}"
+                  f"{baseline[0] / latency:>8.2f}x{similarity:>12.2f}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
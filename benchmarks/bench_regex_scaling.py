@@ -0,0 +1,146 @@
+"""
+Scaling of every text cleaner on adversarial input: huge whitespace runs,
+long unbroken tokens and near-matches repeated many times over.
+
+Each cleaner is timed on every input at a base size and at SCALE times that
+size. Linear code takes about SCALE times as long; the run fails (exit
+status 1) if any cleaner takes more than MAX_GROWTH times as long, which
+is the mark of a backtracking regex or a quadratic loop. The base size is
+grown until the smaller run takes MIN_SECONDS, since ratios of
+millisecond timings are mostly noise. tests/test_regex_scaling.py runs the
+same check.
+
+Run from the repository root:
+    python -m benchmarks.bench_regex_scaling [base_kb]
+"""
+import sys
+import time
+from models import rewrite_rules
+from models.text_utils import TextUtils
+from models.general_formatter import GeneralFormatter
+from models.blockchain_formatter import BlockchainFormatter
+from models.pdf_processor import PDFProcessor
+from models.text_processor import TextProcessor
+from models.document import Document
+from models.word_segmenter import default_segmenter
+
+# Size ratio between the two timed inputs
+SCALE = 4
+
+# Largest time ratio accepted for a SCALE times larger input
+MAX_GROWTH = SCALE * 2
+
+# Shortest run at the base size whose growth is judged
+MIN_SECONDS = 0.02
+
+# Largest base size tried; a cleaner still faster than MIN_SECONDS there
+# is not judged
+MAX_BASE_KB = 1024
+
+
+def _repeat(unit, size):
+    return unit * max(1, size // len(unit))
+
+
+# Adversarial inputs by name, each built to roughly the requested size
+INPUTS = {
+    'whitespace run': lambda size: 'a' + ' ' * size + 'b',
+    'whitespace run, no period': lambda size: 'x' + ' \t' * (size // 2) + 'y',
+    'whitespace around hyphen': lambda size: 'x' + ' ' * (size // 2) + '-' + ' ' * (size // 2) + 'y',
+    'newlines and spaces': lambda size: '\n' + ' ' * size + 'x',
+    'letter run': lambda size: 'a' * size,
+    'glued dictionary words': lambda size: _repeat('blockchaintechnology', size),
+    'digit run': lambda size: '1' * size,
+    'digit run, then percent': lambda size: '1' * size + '.',
+    'dotted digits': lambda size: _repeat('1.', size),
+    'word and digit run': lambda size: _repeat('ab12', size),
+    'near-miss phrase': lambda size: _repeat('topology ( as shown in F ', size),
+    'near-miss PKI': lambda size: _repeat('Public Key Infrastructure ( PKI ', size),
+    'near-miss year range': lambda size: _repeat('2019 - 201 ', size),
+    'near-miss phone': lambda size: _repeat('a 123 - 456 - 78 ', size),
+    'split letters': lambda size: _repeat('a ', size),
+    'capital after space': lambda size: _repeat('x. Y', size),
+}
+
+
+def _cleaners():
+    """Every cleaner entry point and every RuleSet, by name"""
+    cleaners = {
+        'TextUtils.fix_spacing': TextUtils.fix_spacing,
+        'GeneralFormatter.format_text': GeneralFormatter.format_text,
+        'BlockchainFormatter.format_text': BlockchainFormatter.format_text,
+        'PDFProcessor._fix_word_splitting': PDFProcessor()._fix_word_splitting,
+        'TextProcessor.fix_spacing': TextProcessor.fix_spacing,
+        'WordSegmenter.split_glued': default_segmenter().split_glued,
+        'Document.sentences': lambda text: Document(text).sentences,
+    }
+    try:
+        from models.summarizer import Summarizer
+        cleaners['Summarizer._clean_text_for_summarization'] = \
+            lambda text: Summarizer._clean_text_for_summarization(None, text)
+        cleaners['Summarizer._post_process_summary'] = \
+            lambda text: Summarizer._post_process_summary(None, text)
+    except ImportError as e:
+        print(f"Skipping summarizer cleaners: {str(e)}")
+
+    for rule_set in rewrite_rules.RULE_SETS:
+        cleaners[f"RuleSet {rule_set.name}"] = rule_set.apply
+    return cleaners
+
+
+def _timed(clean, text, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        clean(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def check_scaling(base_kb=32, verbose=True):
+    """
+    Time every cleaner on every input and find super-linear growth
+
+    Args:
+        base_kb (int): Smallest base size in KB
+        verbose (bool): Print a line per judged cleaner and input
+
+    Returns:
+        list: (cleaner name, input name) pairs that grew more than MAX_GROWTH
+    """
+    failures = []
+    if verbose:
+        print(f"Base size from {base_kb} KB, x{SCALE}; failing above x{MAX_GROWTH} time growth")
+        print(f"{'cleaner':<44}{'input':<28}{'base KB':>8}{'small s':>9}{'large s':>9}{'growth':>8}")
+
+    for name, clean in _cleaners().items():
+        for input_name, build in INPUTS.items():
+            size_kb = base_kb
+            small = _timed(clean, build(size_kb * 1024))
+            while small < MIN_SECONDS and size_kb * SCALE <= MAX_BASE_KB:
+                size_kb *= SCALE
+                small = _timed(clean, build(size_kb * 1024))
+            if small < MIN_SECONDS:
+                continue
+
+            large = _timed(clean, build(size_kb * 1024 * SCALE))
+            growth = large / small
+            superlinear = growth > MAX_GROWTH
+            if verbose:
+                print(f"{name:<44}{input_name:<28}{size_kb:>8}{small:>9.3f}{large:>9.3f}{growth:>7.1f}x"
+                      + ("  SUPERLINEAR" if superlinear else ""))
+            if superlinear:
+                failures.append((name, input_name))
+    return failures
+
+
+def main(base_kb=32):
+    failures = check_scaling(base_kb)
+    if failures:
+        print(f"{len(failures)} cleaner/input pairs grow super-linearly")
+        sys.exit(1)
+    print("All cleaners scale linearly")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 32)
@@ -0,0 +1,60 @@
+"""
+Throughput of the text cleaners on a long document: in-process versus
+sharded across a growing number of worker processes.
+
+Run from the repository root:
+    python -m benchmarks.bench_sharded_cleanup [pages]
+"""
+import os
+import sys
+import time
+from models.text_utils import TextUtils
+from models.general_formatter import GeneralFormatter
+from models.pdf_processor import PDFProcessor
+from benchmarks.bench_rewrite_rules import SAMPLE
+
+CLEANERS = [
+    ('TextUtils.fix_spacing', TextUtils.fix_spacing),
+    ('GeneralFormatter.format_text', GeneralFormatter.format_text),
+    ('PDFProcessor._fix_word_splitting', PDFProcessor()._fix_word_splitting),
+]
+
+
+def _pages(count):
+    """Page texts that end mid-sentence and mid-word, as extracted pages do"""
+    pages = []
+    for index in range(count):
+        page = SAMPLE * 6
+        cut = (index * 37) % len(SAMPLE)
+        pages.append(page[cut:] + "Continued on the next page, block-")
+    return pages
+
+
+def _timed(clean, text, workers):
+    start = time.perf_counter()
+    result = clean(text, workers)
+    return time.perf_counter() - start, result
+
+
+def main(pages=2000):
+    text = "".join(page_text + "\n" for page_text in _pages(pages))
+    counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    print(f"Input: {pages} pages, {len(text) / (1024 * 1024):.1f} MB, {os.cpu_count()} CPUs")
+    print(f"{'cleaner':<36}" + "".join(f"{f'{count} proc s':>12}" for count in counts) + f"{'speedup':>9}")
+
+    for name, clean in CLEANERS:
+        # Load the word segmenter before timing anything
+        clean(SAMPLE)
+        timings = []
+        expected = None
+        for workers in counts:
+            elapsed, result = _timed(clean, text, workers)
+            expected = result if expected is None else expected
+            assert result == expected, f"{name}: {workers} workers differ from the in-process output"
+            timings.append(elapsed)
+        print(f"{name:<36}" + "".join(f"{elapsed:>12.2f}" for elapsed in timings)
+              + f"{timings[0] / min(timings):>8.1f}x")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
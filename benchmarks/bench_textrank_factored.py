@@ -0,0 +1,55 @@
+"""
+Time and memory of TextRank in ExtractiveSummarizer: PageRank over the
+dense similarity matrix versus the factored ranking, which multiplies by
+the sparse term matrix instead of building the n x n matrix.
+
+The dense path is only run up to DENSE_MAX_SENTENCES, since its matrix
+grows with the square of the sentence count; both paths must agree there.
+
+Run from the repository root:
+    python -m benchmarks.bench_textrank_factored [max_sentences]
+"""
+import sys
+import time
+import tracemalloc
+import numpy as np
+from models.extractive_summarizer import ExtractiveSummarizer
+from benchmarks.bench_extractive_similarity import _sentences
+
+SIZES = (1000, 2000, 5000, 10000, 20000, 50000, 100000)
+
+# Largest input the dense path is run on
+DENSE_MAX_SENTENCES = 5000
+
+
+def _measured(rank, sentences):
+    """Seconds, peak MB allocated and the scores of one ranking"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    scores = rank(sentences)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return elapsed, peak, scores
+
+
+def main(max_sentences=100000):
+    summarizer = ExtractiveSummarizer()
+    dense = lambda sentences: summarizer._page_rank(summarizer._build_similarity_matrix(sentences))
+    print(f"{'sentences':>10}{'dense s':>9}{'dense MB':>10}{'factored s':>12}{'factored MB':>13}")
+
+    for size in (size for size in SIZES if size <= max_sentences):
+        sentences = _sentences(size)
+        factored_seconds, factored_mb, factored = _measured(summarizer._factored_page_rank, sentences)
+        columns = f"{factored_seconds:>12.2f}{factored_mb:>13.1f}"
+
+        if size <= DENSE_MAX_SENTENCES:
+            dense_seconds, dense_mb, expected = _measured(dense, sentences)
+            assert np.allclose(factored, expected, rtol=0, atol=1e-12), f"{size} sentences: scores differ"
+            print(f"{size:>10}{dense_seconds:>9.2f}{dense_mb:>10.1f}" + columns)
+        else:
+            print(f"{size:>10}{'-':>9}{'-':>10}" + columns)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,52 @@
+"""
+Throughput of the run-together word splitter: one re.sub per word pair
+versus the single-scan BoundaryInserter, at growing vocabulary sizes.
+
+Run from the repository root:
+    python -m benchmarks.bench_word_boundaries [size_kb]
+"""
+import random
+import sys
+import time
+from models.word_boundaries import BoundaryInserter, COMMON_WORDS
+
+
+def _sample(words, size):
+    """Text mixing plain words, glued word pairs and punctuation"""
+    rnd = random.Random(0)
+    pieces = []
+    while sum(len(piece) + 1 for piece in pieces) < size:
+        choice = rnd.random()
+        if choice < 0.3:
+            pieces.append(rnd.choice(words) + rnd.choice(words).capitalize())
+        elif choice < 0.4:
+            pieces.append(rnd.choice(words) + rnd.choice(words) + ".")
+        else:
+            pieces.append(rnd.choice(["the", "of", "network", "consensus", "ordering", "peers"]))
+    return " ".join(pieces)
+
+
+def _timed(apply, text):
+    start = time.perf_counter()
+    result = apply(text)
+    return time.perf_counter() - start, result
+
+
+def main(size_kb=32):
+    # Extra synthetic words show how each path scales with the vocabulary
+    extra = [f"{word}{suffix}" for suffix in ("s", "ed", "er") for word in COMMON_WORDS]
+    print(f"{'words':>6}{'pairs':>8}{'before s':>10}{'after s':>10}{'speedup':>9}")
+
+    for size in (len(COMMON_WORDS), len(COMMON_WORDS) * 2, len(COMMON_WORDS) * 4):
+        words = (list(COMMON_WORDS) + extra)[:size]
+        inserter = BoundaryInserter(words)
+        text = _sample(words, size_kb * 1024)
+
+        before, expected = _timed(inserter.apply_sequential, text)
+        after, actual = _timed(inserter.apply, text)
+        assert actual == expected, f"{size} words: output differs from the pairwise loop"
+        print(f"{size:>6}{size * (size - 1):>8}{before:>10.3f}{after:>10.3f}{before / after:>8.0f}x")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 32)
@@ -0,0 +1,126 @@
+import re
+from concurrent.futures import ProcessPoolExecutor
+from models.text_utils import TextUtils
+from models.process_context import process_context
+
+# Chapter headings recognised at the top of a page when a PDF has no outline
+HEADING_PATTERN = re.compile(
+    r'^\s*((?:chapter|part)\s+(?:\d+|[ivxlc]+|one|two|three|four|five|six|seven|eight|nine|ten)\b.{0,80})$',
+    re.IGNORECASE
+)
+
+# Number of lines at the top of each page searched for a heading
+HEADING_SEARCH_LINES = 3
+
+
+def _summarize_chapter(text, ratio, mode='position'):
+    """Summarize one chapter's text (runs inside a worker process)"""
+    return TextUtils.summarize_text(text, ratio, mode)
+
+
+class ChapterSplitter:
+    """Split a book into chapters and summarize them concurrently"""
+
+    @staticmethod
+    def detect_headings(pages):
+        """
+        Find chapter starts from headings at the top of each page
+
+        Args:
+            pages (list): Raw page texts
+
+        Returns:
+            list: (title, page_index) tuples in page order
+        """
+        starts = []
+        for index, page_text in enumerate(pages):
+            lines = [line for line in page_text.splitlines() if line.strip()]
+            for line in lines[:HEADING_SEARCH_LINES]:
+                match = HEADING_PATTERN.match(line)
+                if match:
+                    starts.append((match.group(1).strip(), index))
+                    break
+        return starts
+
+    @staticmethod
+    def split(pages, outline=None):
+        """
+        Split page texts into chapters
+
+        Uses the PDF outline when it has entries, otherwise headings detected
+        in the text. A book with neither comes back as a single chapter.
+
+        Args:
+            pages (list): Raw page texts
+            outline (list): (title, page_index) tuples from the PDF outline
+
+        Returns:
+            list: Chapter dicts with 'title', 'start_page', 'end_page'
+                (1-based, inclusive) and 'text'
+        """
+        starts = outline or ChapterSplitter.detect_headings(pages)
+
+        # Keep the first entry per page, in page order
+        seen_pages = set()
+        boundaries = []
+        for title, page_index in sorted(starts, key=lambda start: start[1]):
+            if 0 <= page_index < len(pages) and page_index not in seen_pages:
+                seen_pages.add(page_index)
+                boundaries.append((title, page_index))
+
+        if not boundaries:
+            boundaries = [("Document", 0)]
+        elif boundaries[0][1] > 0:
+            boundaries.insert(0, ("Front Matter", 0))
+
+        chapters = []
+        for i, (title, start) in enumerate(boundaries):
+            stop = boundaries[i + 1][1] if i + 1 < len(boundaries) else len(pages)
+            text = "".join(page_text + "\n" for page_text in pages[start:stop])
+            if not text.strip():
+                continue
+            chapters.append({
+                'title': title,
+                'start_page': start + 1,
+                'end_page': stop,
+                'text': text
+            })
+
+        return chapters
+
+    @staticmethod
+    def summarize(chapters, ratio=0.5, workers=None, mode='position'):
+        """
+        Summarize each chapter on a worker pool and merge the results
+
+        Args:
+            chapters (list): Chapter dicts as returned by split()
+            ratio (float): Proportion of sentences to keep in each chapter
+            workers (int): Number of worker processes; None or 1 runs in-process
+            mode (str): Sentence selection passed to TextUtils.summarize_text
+
+        Returns:
+            dict: 'chapters' (title, page range and summary per chapter) and
+                'summary' (the chapter summaries merged in book order)
+        """
+        texts = [chapter['text'] for chapter in chapters]
+
+        if workers and workers > 1 and len(chapters) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(chapters)), mp_context=process_context()) as executor:
+                summaries = list(executor.map(_summarize_chapter, texts, [ratio] * len(texts), [mode] * len(texts)))
+        else:
+            summaries = [_summarize_chapter(text, ratio, mode) for text in texts]
+
+        chapter_summaries = []
+        for chapter, summary in zip(chapters, summaries):
+            chapter_summaries.append({
+                'title': chapter['title'],
+                'start_page': chapter['start_page'],
+                'end_page': chapter['end_page'],
+                'summary': summary
+            })
+
+        return {
+            'chapters': chapter_summaries,
+            'summary': "\n\n".join(summary for summary in summaries if summary)
+        }
@@ -0,0 +1,124 @@
+import re
+from models.word_segmenter import default_segmenter
+
+# Cleanup profiles, from most to least work
+PROFILES = ('full', 'light', 'none')
+
+# Characters read when estimating how much repair a text needs
+SAMPLE_CHARS = 32 * 1024
+
+# Number of evenly spaced windows the sample is drawn from
+SAMPLE_WINDOWS = 8
+
+# Tokens this long are almost always several words run together
+LONG_TOKEN_LENGTH = 20
+
+# Damage per 1000 tokens above which a profile is chosen
+FULL_THRESHOLD = 3.0
+LIGHT_THRESHOLD = 2.0
+
+# Tokens per character below which the text has lost most of its spaces
+# (English prose has about one token per 6 characters)
+MIN_TOKEN_DENSITY = 1 / 25
+
+_TOKEN = re.compile(r'\S+')
+
+# Everything between the first and the last whitespace of a window
+_WINDOW_INNER = re.compile(r'\s(.*)\s', re.DOTALL)
+
+# A sentence or clause running into the next one ("end.Next", "one,two");
+# abbreviations such as "e.g." and host names are not counted
+_MISSING_SPACE = re.compile(r'[a-z]{2}[.!?][A-Z][a-z]|[a-z]{2}[,;:][a-z]{2}')
+
+# Two words run together at a case change ("decentralizedSystems")
+_CASE_JOIN = re.compile(r'[a-z]{2}[A-Z][a-z]')
+
+
+class CleanlinessDetector:
+    """Estimate how much repair extracted text needs from a small sample"""
+
+    @staticmethod
+    def sample(text, sample_chars=SAMPLE_CHARS, windows=SAMPLE_WINDOWS):
+        """
+        Take evenly spaced windows of text, cut at whitespace where they have any
+
+        Args:
+            text (str): Full text
+            sample_chars (int): Total characters to take
+            windows (int): Number of windows
+
+        Returns:
+            str: The windows joined by newlines (the whole text if it is short)
+        """
+        if len(text) <= sample_chars:
+            return text
+
+        size = sample_chars // windows
+        stride = len(text) // windows
+        pieces = []
+        for index in range(windows):
+            window = text[index * stride:index * stride + size]
+            # Drop the partial tokens at either end of the window; a window
+            # without whitespace is all one glued token and is kept as it is
+            inner = _WINDOW_INNER.search(window)
+            pieces.append(inner.group(1) if inner else window)
+        return '\n'.join(pieces)
+
+    @staticmethod
+    def measure(text):
+        """
+        Count damage signals in a sample of text
+
+        Args:
+            text (str): Extracted text
+
+        Returns:
+            dict: 'tokens' and 'chars' in the sample, and 'long_tokens',
+                'glued_tokens', 'missing_spaces' and 'case_joins' per 1000
+                tokens
+        """
+        sample = CleanlinessDetector.sample(text)
+        tokens = _TOKEN.findall(sample)
+        if not tokens:
+            return {'tokens': 0, 'chars': len(sample), 'long_tokens': 0.0, 'glued_tokens': 0.0,
+                    'missing_spaces': 0.0, 'case_joins': 0.0}
+
+        segmenter = default_segmenter()
+        words = [token.strip('.,;:!?()[]"\'') for token in tokens]
+        long_tokens = sum(1 for word in words if len(word) >= LONG_TOKEN_LENGTH and word.isalpha())
+        glued_tokens = sum(1 for word in words if segmenter.split_token(word) != word)
+
+        per_thousand = 1000.0 / len(tokens)
+        return {
+            'tokens': len(tokens),
+            'chars': len(sample),
+            'long_tokens': long_tokens * per_thousand,
+            'glued_tokens': glued_tokens * per_thousand,
+            'missing_spaces': len(_MISSING_SPACE.findall(sample)) * per_thousand,
+            'case_joins': len(_CASE_JOIN.findall(sample)) * per_thousand
+        }
+
+    @staticmethod
+    def choose_profile(text):
+        """
+        Pick the cheapest cleanup profile that repairs text
+
+        'full' runs every spacing rule and splits glued words, 'light' runs
+        the spacing rules only and 'none' leaves the text as extracted.
+
+        Args:
+            text (str): Extracted text
+
+        Returns:
+            str: One of PROFILES
+        """
+        signals = CleanlinessDetector.measure(text)
+        # Text with (almost) no spaces left has few tokens to count damage
+        # in, and needs the most repair
+        if signals['tokens'] < signals['chars'] * MIN_TOKEN_DENSITY:
+            return 'full'
+        if signals['long_tokens'] + signals['glued_tokens'] >= FULL_THRESHOLD:
+            return 'full'
+        if signals['missing_spaces'] + signals['case_joins'] >= LIGHT_THRESHOLD:
+            return 'light'
+        return 'none'
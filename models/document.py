@@ -0,0 +1,56 @@
+import re
+from collections import Counter
+from functools import cached_property
+
+# Sentence boundary used by the extractive summaries
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+(?=[A-Z])')
+
+
+class Document:
+    """
+    The text of one upload, analyzed once and shared by every pipeline stage
+
+    Every view (normalized text, sentences, tokens, word counts) is computed
+    on first access and cached, so the summarizer, keyword extractor and
+    topic extractor never repeat each other's preprocessing.
+    """
+
+    def __init__(self, text, normalize=None):
+        """
+        Args:
+            text (str): Document text
+            normalize (callable): Cleanup applied to text on first use, such
+                as TextUtils.fix_spacing; None if text is already normalized
+        """
+        self.raw_text = text or ""
+        self._normalize = normalize
+
+    @cached_property
+    def text(self):
+        """Normalized text"""
+        if self._normalize is None:
+            return self.raw_text
+        return self._normalize(self.raw_text) if self.raw_text else ""
+
+    @cached_property
+    def lower_text(self):
+        """Normalized text in lowercase"""
+        return self.text.lower()
+
+    @cached_property
+    def sentences(self):
+        """Sentences of the normalized text, in order"""
+        return SENTENCE_BOUNDARY.split(self.text)
+
+    @cached_property
+    def tokens(self):
+        """Lowercase whitespace-separated tokens"""
+        return self.lower_text.split()
+
+    @cached_property
+    def word_counts(self):
+        """Counter of tokens, ordered by first occurrence"""
+        return Counter(self.tokens)
+
+    def __len__(self):
+        return len(self.text)
@@ -1,9 +1,19 @@
 import re
+from collections import Counter
 import nltk
 from nltk.tokenize import sent_tokenize
 from nltk.corpus import stopwords
 from nltk.cluster.util import cosine_distance
 import numpy as np
+from scipy.sparse import csr_matrix, diags
+
+# Rows of the similarity matrix computed per sparse product, which bounds
+# the size of the sparse intermediate result
+SIMILARITY_BLOCK_ROWS = 1024
+
+# Sentence count from which summarize() ranks sentences from the term
+# matrix directly instead of materializing the n x n similarity matrix
+FACTORED_MIN_SENTENCES = 2000
 
 class ExtractiveSummarizer:
     def __init__(self):
@@ -38,25 +48,20 @@ class ExtractiveSummarizer:
         if len(sentences) <= 3:
             return text
         
-        # Calculate sentence similarity matrix
-        similarity_matrix = self._build_similarity_matrix(sentences)
-        
-        # Rank sentences using PageRank algorithm
-        sentence_scores = self._page_rank(similarity_matrix)
+        # Rank sentences using PageRank algorithm; long texts skip the
+        # similarity matrix, whose size grows with the square of n
+        if len(sentences) >= FACTORED_MIN_SENTENCES:
+            sentence_scores = self._factored_page_rank(sentences)
+        else:
+            similarity_matrix = self._build_similarity_matrix(sentences)
+            sentence_scores = self._page_rank(similarity_matrix)
         
         # Calculate number of sentences to include
         num_sentences = max(1, int(len(sentences) * ratio))
         
-        # Get top ranked sentences
-        ranked_sentences = [sentences[i] for i in np.argsort(sentence_scores)[-num_sentences:]]
-        
-        # Sort sentences by their original order
-        original_order = []
-        for sentence in ranked_sentences:
-            original_order.append((sentences.index(sentence), sentence))
-        
-        original_order.sort()
-        summary = ' '.join([s[1] for s in original_order])
+        # Get top ranked sentences, in their original order
+        top_indices = np.sort(np.argsort(sentence_scores)[-num_sentences:])
+        summary = ' '.join(sentences[i] for i in top_indices)
         
         return summary
     
@@ -104,17 +109,60 @@ class ExtractiveSummarizer:
         # Calculate cosine similarity
         return 1 - cosine_distance(vector1, vector2)
     
+    def _term_matrix(self, sentences):
+        """
+        Count the words of every sentence, tokenizing each sentence once
+        
+        Args:
+            sentences (list): Sentences to count
+            
+        Returns:
+            csr_matrix: Sentence x word counts, without stop words
+        """
+        vocabulary = {}
+        rows = []
+        columns = []
+        counts = []
+        for row, sentence in enumerate(sentences):
+            words = [word.lower() for word in nltk.word_tokenize(sentence)]
+            for word, count in Counter(word for word in words if word not in self.stop_words).items():
+                rows.append(row)
+                columns.append(vocabulary.setdefault(word, len(vocabulary)))
+                counts.append(count)
+        
+        return csr_matrix((counts, (rows, columns)), shape=(len(sentences), len(vocabulary)), dtype=np.float64)
+    
+    def _unit_term_matrix(self, sentences):
+        """Term matrix with each row scaled to unit length (empty rows stay 0)"""
+        terms = self._term_matrix(sentences)
+        norms = np.sqrt(np.asarray(terms.multiply(terms).sum(axis=1)).ravel())
+        inverse_norms = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+        return (diags(inverse_norms) @ terms).tocsr()
+    
     def _build_similarity_matrix(self, sentences):
-        """Build similarity matrix for all sentences"""
-        # Initialize similarity matrix
-        similarity_matrix = np.zeros((len(sentences), len(sentences)))
+        """
+        Build similarity matrix for all sentences
+        
+        Computes the same cosine similarity as _sentence_similarity for every
+        pair at once: the rows of the term matrix are scaled to unit length,
+        so their products are the cosines. Sentences with no words left after
+        stop word removal score 0, as does the diagonal.
+        
+        Args:
+            sentences (list): Sentences to compare
+            
+        Returns:
+            ndarray: n x n similarity matrix
+        """
+        unit_terms = self._unit_term_matrix(sentences)
         
-        # Fill similarity matrix
-        for i in range(len(sentences)):
-            for j in range(len(sentences)):
-                if i != j:
-                    similarity_matrix[i][j] = self._sentence_similarity(sentences[i], sentences[j])
+        similarity_matrix = np.empty((len(sentences), len(sentences)))
+        unit_terms_t = unit_terms.T.tocsc()
+        for start in range(0, len(sentences), SIMILARITY_BLOCK_ROWS):
+            stop = start + SIMILARITY_BLOCK_ROWS
+            similarity_matrix[start:stop] = (unit_terms[start:stop] @ unit_terms_t).toarray()
         
+        np.fill_diagonal(similarity_matrix, 0.0)
         return similarity_matrix
     
     def _page_rank(self, similarity_matrix, damping=0.85, max_iter=100, tol=1e-5):
@@ -139,4 +187,51 @@ class ExtractiveSummarizer:
             if np.abs(scores - prev_scores).sum() < tol:
                 break
         
-        return scores
\ No newline at end of file
+        return scores
+    
+    def _factored_page_rank(self, sentences, damping=0.85, max_iter=100, tol=1e-5):
+        """
+        Rank sentences as _page_rank(_build_similarity_matrix(sentences))
+        does, without building the similarity matrix
+        
+        The similarity matrix is U @ U.T with its diagonal zeroed, U being
+        the unit-length term matrix, so every product with it can be taken
+        as two sparse products with U. Time and memory per iteration grow
+        with the number of words in the text rather than with n^2.
+        
+        Args:
+            sentences (list): Sentences to rank
+            damping (float): PageRank damping factor
+            max_iter (int): Maximum number of power iterations
+            tol (float): Convergence threshold on the L1 change in scores
+            
+        Returns:
+            ndarray: Score per sentence
+        """
+        n = len(sentences)
+        unit_terms = self._unit_term_matrix(sentences)
+        unit_terms_t = unit_terms.T.tocsr()
+        self_similarity = np.asarray(unit_terms.multiply(unit_terms).sum(axis=1)).ravel()
+        
+        def similarity_product(vector):
+            return unit_terms @ (unit_terms_t @ vector) - self_similarity * vector
+        
+        # Row sums of the similarity matrix, for the row normalization; a
+        # sentence sharing no words comes out as rounding error, not 0
+        row_sums = similarity_product(np.ones(n))
+        inverse_sums = np.divide(1.0, row_sums, out=np.zeros_like(row_sums), where=row_sums > 1e-9)
+        
+        # Initialize scores
+        scores = np.ones(n) / n
+        
+        # Power iteration; the matrix is symmetric, so the transposed
+        # normalized matrix times scores is the matrix times scores / row_sums
+        for _ in range(max_iter):
+            prev_scores = scores
+            scores = (1 - damping) / n + damping * similarity_product(scores * inverse_sums)
+            
+            # Check convergence
+            if np.abs(scores - prev_scores).sum() < tol:
+                break
+        
+        return scores
@@ -0,0 +1,88 @@
+from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, pipeline
+
+try:
+    import torch
+except ImportError:  # Only needed by the 'int8' backend
+    torch = None
+
+try:
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+except ImportError:  # Only needed by the 'onnx' backend
+    ORTModelForSeq2SeqLM = None
+
+# How a seq2seq model runs on CPU: 'torch' is fp32 eager PyTorch, 'int8'
+# the same model with dynamically quantized linear layers, 'onnx' an ONNX
+# Runtime export
+BACKENDS = ('torch', 'int8', 'onnx')
+
+
+def quantize_int8(model):
+    """
+    Quantize a PyTorch model's linear layers to int8
+
+    Weights are stored as int8 and activations are quantized on the fly,
+    which cuts the model's memory by about 4x for the linear layers and
+    speeds up CPU matrix products; embeddings and layer norms stay fp32.
+
+    Args:
+        model: PyTorch model
+
+    Returns:
+        The quantized model, in eval mode
+    """
+    if torch is None:
+        raise ImportError("The 'int8' backend needs PyTorch")
+    return torch.quantization.quantize_dynamic(model.eval(), {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def load_seq2seq(model_name, backend='torch', model=None, tokenizer=None, local_files_only=False):
+    """
+    Load a seq2seq model and its tokenizer for one backend
+
+    Args:
+        model_name (str): Hub name or local checkpoint directory
+        backend (str): One of BACKENDS
+        model: Already loaded fp32 model to use for 'torch' and 'int8'
+            instead of loading model_name
+        tokenizer: Already loaded tokenizer to use instead of loading it
+        local_files_only (bool): Never download, only read local files
+
+    Returns:
+        tuple: (model, tokenizer)
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {backend}")
+
+    if tokenizer is None:
+        tokenizer = AutoTokenizer.from_pretrained(model_name, local_files_only=local_files_only)
+
+    if backend == 'onnx':
+        if ORTModelForSeq2SeqLM is None:
+            raise ImportError("The 'onnx' backend needs optimum[onnxruntime]")
+        # Exports the checkpoint to ONNX on load (cached by the Hub cache)
+        model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True, local_files_only=local_files_only)
+        return model, tokenizer
+
+    if model is None:
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_name, local_files_only=local_files_only)
+    if backend == 'int8':
+        model = quantize_int8(model)
+    return model, tokenizer
+
+
+def load_pipeline(model_name, backend='torch', model=None, tokenizer=None, local_files_only=False):
+    """
+    Build a summarization pipeline on one backend
+
+    Args:
+        model_name (str): Hub name or local checkpoint directory
+        backend (str): One of BACKENDS
+        model: Already loaded fp32 model (see load_seq2seq)
+        tokenizer: Already loaded tokenizer (see load_seq2seq)
+        local_files_only (bool): Never download, only read local files
+
+    Returns:
+        Pipeline: Summarization pipeline
+    """
+    model, tokenizer = load_seq2seq(model_name, backend, model, tokenizer, local_files_only)
+    return pipeline("summarization", model=model, tokenizer=tokenizer)
@@ -0,0 +1,210 @@
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+# Most requests run in one forward pass
+MAX_BATCH_SIZE = 8
+
+# Longest a request waits for others to share its forward pass
+MAX_WAIT_SECONDS = 0.015
+
+# Queue waits kept for the percentiles reported by stats()
+WAIT_SAMPLES = 1000
+
+# Put on the queue by close() to stop the worker thread
+_STOP = object()
+
+
+def _percentile_ms(sorted_seconds, share):
+    """Percentile of sorted durations in seconds, in milliseconds"""
+    if not sorted_seconds:
+        return 0.0
+    return round(sorted_seconds[min(len(sorted_seconds) - 1, int(share * len(sorted_seconds)))] * 1000, 2)
+
+
+class _Request:
+    """One queued text with its generation settings and result future"""
+
+    def __init__(self, text, settings):
+        self.text = text
+        self.settings = settings
+        self.key = tuple(sorted(settings.items()))
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class InferenceServer:
+    """
+    Group concurrent model calls into micro-batches on one worker thread
+
+    Callers submit one text at a time and get a Future back. The worker
+    takes the oldest queued request, waits up to max_wait for others with
+    the same generation settings (max_length, min_length, ...) and runs
+    them together in a single run_batch call. Requests with other settings
+    wait for a later batch, in arrival order.
+    """
+
+    def __init__(self, run_batch, max_batch_size=MAX_BATCH_SIZE, max_wait=MAX_WAIT_SECONDS):
+        """
+        Args:
+            run_batch (callable): Takes a list of texts and the generation
+                settings as keyword arguments and returns one result per text
+            max_batch_size (int): Most texts per run_batch call
+            max_wait (float): Seconds the first request of a batch waits for
+                more requests
+        """
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._held = deque()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def submit(self, text, **settings):
+        """
+        Queue a text for the next compatible batch
+
+        Args:
+            text (str): Model input
+            **settings: Generation settings; only requests with equal
+                settings share a batch
+
+        Returns:
+            Future: Resolves to run_batch's result for this text
+        """
+        self._ensure_started()
+        request = _Request(text, settings)
+        self._queue.put(request)
+        return request.future
+
+    def __call__(self, text, **settings):
+        """Submit text and wait for its result"""
+        return self.submit(text, **settings).result()
+
+    def close(self):
+        """Stop the worker thread once the queued requests have run"""
+        with self._start_lock:
+            if self._thread is None:
+                return
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._serve, name="inference-server", daemon=True)
+                self._thread.start()
+
+    def _next_request(self, timeout=None):
+        """
+        Oldest held request, else the next one from the queue
+
+        Requests already queued are returned even when timeout has run out;
+        None means the queue stayed empty for timeout seconds.
+        """
+        if self._held:
+            return self._held.popleft()
+        try:
+            if timeout is not None and timeout <= 0:
+                return self._queue.get_nowait()
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _serve(self):
+        """Worker loop: collect a batch, run it, resolve its futures"""
+        stopping = False
+        while not stopping or self._held:
+            first = self._next_request()
+            if first is _STOP:
+                stopping = True
+                continue
+
+            batch = [first]
+            skipped = deque()
+            deadline = first.enqueued + self.max_wait
+            # Setting aside too many other requests would starve them, so
+            # the scan stops after max_batch_size of them
+            while len(batch) < self.max_batch_size and len(skipped) < self.max_batch_size:
+                # Requests already waiting join at once; new ones only until the deadline
+                if stopping and not self._held:
+                    break
+                request = self._next_request(deadline - time.perf_counter())
+                if request is None:
+                    break
+                if request is _STOP:
+                    stopping = True
+                elif request.key == first.key:
+                    batch.append(request)
+                else:
+                    skipped.append(request)
+            self._held.extendleft(reversed(skipped))
+
+            self._run(batch)
+
+    def _run(self, batch):
+        """Run one batch and hand each request its result"""
+        started = time.perf_counter()
+        try:
+            results = list(self.run_batch([request.text for request in batch], **batch[0].settings))
+            # A short result list would otherwise leave some callers waiting forever
+            if len(results) != len(batch):
+                raise RuntimeError(f"run_batch returned {len(results)} results for {len(batch)} texts")
+        except Exception as e:
+            for request in batch:
+                request.future.set_exception(e)
+        else:
+            for request, result in zip(batch, results):
+                request.future.set_result(result)
+        self._record(batch, started, time.perf_counter() - started)
+
+    def _record(self, batch, started, seconds):
+        with self._stats_lock:
+            self._batch_sizes[len(batch)] += 1
+            self._run_seconds += seconds
+            for request in batch:
+                self._waits.append(started - request.enqueued)
+                self._wait_total += started - request.enqueued
+                self._requests += 1
+
+    def reset_stats(self):
+        """Clear the batch and queue-wait counters"""
+        with self._stats_lock:
+            self._batch_sizes = Counter()
+            self._waits = deque(maxlen=WAIT_SAMPLES)
+            self._wait_total = 0.0
+            self._run_seconds = 0.0
+            self._requests = 0
+
+    def stats(self):
+        """
+        Batching counters since the last reset
+
+        Returns:
+            dict: 'requests', 'batches', 'batch_sizes' (batch size to
+                count), 'mean_batch_size', 'queue_wait_ms' (mean over all
+                requests, p50/p95/max over the last WAIT_SAMPLES) and
+                'run_seconds' spent in run_batch
+        """
+        with self._stats_lock:
+            batches = sum(self._batch_sizes.values())
+            waits = sorted(self._waits)
+            return {
+                'requests': self._requests,
+                'batches': batches,
+                'batch_sizes': dict(sorted(self._batch_sizes.items())),
+                'mean_batch_size': round(self._requests / batches, 2) if batches else 0.0,
+                'queue_wait_ms': {
+                    'mean': round(self._wait_total / self._requests * 1000, 2) if self._requests else 0.0,
+                    'p50': _percentile_ms(waits, 0.5),
+                    'p95': _percentile_ms(waits, 0.95),
+                    'max': _percentile_ms(waits, 1.0)
+                },
+                'run_seconds': round(self._run_seconds, 3)
+            }
@@ -0,0 +1,236 @@
+import gc
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; only the size estimates are then used
+    resource = None
+
+# Resident memory (MB) the loaded models may bring the process up to
+MEMORY_BUDGET_MB = 6144
+
+# Memory (MB) a model is expected to add when loaded, until its load has
+# been measured
+MODEL_SIZE_MB = {
+    'bart': 1200,
+    't5': 350,
+    'mbart': 2600,
+    'mt5': 1300
+}
+
+# Expected size of a model missing from MODEL_SIZE_MB
+DEFAULT_MODEL_MB = 1500
+
+
+def _rss_mb():
+    """Resident memory of this process in MB, or None if it cannot be read"""
+    if resource is None:
+        return None
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize() / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class ModelHandle:
+    """
+    A loaded model that is safe to call from several threads
+
+    Pipelines and fast tokenizers keep per-call state, so calls into one
+    model are serialized by its lock; different models still run in
+    parallel. The handle is what ModelPool loaders return, so every thread
+    asking the pool for a model gets the same lock with it.
+    """
+
+    def __init__(self, name, model):
+        """
+        Args:
+            name (str): Model name
+            model: Loaded model, such as a transformers pipeline
+        """
+        self.name = name
+        self.model = model
+        self.lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs):
+        """Call the model under its lock"""
+        with self.lock:
+            return self.model(*args, **kwargs)
+
+    @property
+    def tokenizer(self):
+        """The model's tokenizer, or None if it has none"""
+        return getattr(self.model, 'tokenizer', None)
+
+    def tokenize(self, texts, **kwargs):
+        """Run the model's tokenizer on texts under the model's lock"""
+        with self.lock:
+            return self.tokenizer(texts, **kwargs)
+
+
+class ModelPool:
+    """
+    Keep several loaded models in memory, evicting the least recently used
+
+    Switching between models (English and multilingual traffic, say) then
+    costs a dictionary lookup instead of a reload from disk. Before a model
+    is loaded, least recently used models are evicted until the process's
+    resident memory plus the new model's expected size, less the recorded
+    sizes of the evicted models, fits the budget.
+    """
+
+    def __init__(self, loader, memory_budget_mb=MEMORY_BUDGET_MB, size_estimates=None):
+        """
+        Args:
+            loader (callable): Takes a model name and returns the loaded model
+            memory_budget_mb (int): Resident memory budget in MB
+            size_estimates (dict): Expected MB per model name (defaults to
+                MODEL_SIZE_MB); replaced by the measured size after a load
+        """
+        self.loader = loader
+        self.memory_budget_mb = memory_budget_mb
+        self.sizes = dict(MODEL_SIZE_MB if size_estimates is None else size_estimates)
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+        # Loads run one at a time, so the memory check before each load sees
+        # the previous one; models already loaded are served meanwhile
+        self._load_lock = threading.Lock()
+        self._hits = 0
+        self._loads = 0
+        self._evictions = 0
+        self._load_seconds = 0.0
+
+    def get(self, name):
+        """
+        Return a loaded model, loading it (and evicting others) if needed
+
+        Args:
+            name (str): Model name passed to the loader
+
+        Returns:
+            The loaded model
+        """
+        model = self._lookup(name)
+        if model is not None:
+            return model
+
+        with self._load_lock:
+            # Another thread may have loaded it while this one waited
+            model = self._lookup(name)
+            if model is not None:
+                return model
+
+            with self._lock:
+                evicted = self._make_room(self.sizes.get(name, DEFAULT_MODEL_MB))
+            if evicted:
+                # Free the evicted models' tensors before the next one is loaded
+                gc.collect()
+
+            before = _rss_mb()
+            start = time.perf_counter()
+            model = self.loader(name)
+            seconds = time.perf_counter() - start
+            after = _rss_mb()
+
+            with self._lock:
+                self._load_seconds += seconds
+                self._loads += 1
+                if before is not None and after is not None and after > before:
+                    self.sizes[name] = after - before
+                self._models[name] = model
+            return model
+
+    def _lookup(self, name):
+        """The loaded model, marked most recently used, or None"""
+        with self._lock:
+            if name not in self._models:
+                return None
+            self._models.move_to_end(name)
+            self._hits += 1
+            return self._models[name]
+
+    def _make_room(self, needed_mb):
+        """
+        Evict least recently used models until needed_mb more fits the budget
+
+        Memory is read once and each eviction is credited with the model's
+        recorded size: the allocator may keep freed memory, so resident
+        memory need not drop, and re-reading it would evict every model.
+        Called under the lock; the caller collects garbage after releasing it.
+
+        Returns:
+            int: Number of models evicted
+        """
+        excess = self._used_mb() + needed_mb - self.memory_budget_mb
+        evicted = 0
+        while self._models and excess > 0:
+            name, _ = self._models.popitem(last=False)
+            excess -= self.sizes.get(name, DEFAULT_MODEL_MB)
+            evicted += 1
+            self._evictions += 1
+            print(f"Evicting model to stay within memory budget: {name}")
+        return evicted
+
+    def _used_mb(self):
+        """Resident memory, or the summed sizes of the loaded models if it cannot be read"""
+        rss = _rss_mb()
+        if rss is not None:
+            return rss
+        return sum(self.sizes.get(name, DEFAULT_MODEL_MB) for name in self._models)
+
+    def preload(self, names, warmup=None):
+        """
+        Load models ahead of traffic, most important last (it ends up most
+        recently used)
+
+        Args:
+            names (list): Model names
+            warmup (callable): Called with each name and model after loading,
+                to run one inference and trigger any lazy initialization
+        """
+        for name in names:
+            model = self.get(name)
+            if warmup is not None:
+                try:
+                    warmup(name, model)
+                except Exception as e:
+                    print(f"Error warming up model {name}: {str(e)}")
+
+    def evict(self, name):
+        """Drop a model from the pool; returns whether it was loaded"""
+        with self._lock:
+            if self._models.pop(name, None) is None:
+                return False
+            self._evictions += 1
+        gc.collect()
+        return True
+
+    def loaded(self):
+        """Names of the loaded models, least recently used first"""
+        with self._lock:
+            return list(self._models)
+
+    def stats(self):
+        """
+        Pool counters
+
+        Returns:
+            dict: 'loaded' models (least recently used first), 'hits',
+                'loads', 'evictions', 'load_seconds', 'rss_mb',
+                'budget_mb' and the known model 'sizes_mb'
+        """
+        with self._lock:
+            rss = _rss_mb()
+            return {
+                'loaded': list(self._models),
+                'hits': self._hits,
+                'loads': self._loads,
+                'evictions': self._evictions,
+                'load_seconds': round(self._load_seconds, 2),
+                'rss_mb': round(rss, 1) if rss is not None else None,
+                'budget_mb': self.memory_budget_mb,
+                'sizes_mb': {name: round(size, 1) for name, size in self.sizes.items()}
+            }
@@ -0,0 +1,222 @@
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+import PyPDF2
+from models.process_context import process_context
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; memory budgets are then not enforced
+    resource = None
+
+
+class ExtractionBudget:
+    """Wall-clock and memory limits for extracting one PDF"""
+
+    def __init__(self, page_timeout=10.0, document_timeout=60.0, page_memory_mb=512, min_pages=0, min_bytes=0):
+        """
+        Args:
+            page_timeout (float): Seconds a single page may take
+            document_timeout (float): Seconds the whole document may take
+            page_memory_mb (int): Extra address space (MB) a worker may use
+                on top of its size at start-up; None disables the limit
+            min_pages (int): Documents with fewer pages, if also smaller
+                than min_bytes, are extracted in-process without limits
+            min_bytes (int): Size in bytes below which, with fewer than
+                min_pages pages, a document is extracted in-process
+        """
+        self.page_timeout = page_timeout
+        self.document_timeout = document_timeout
+        self.page_memory_mb = page_memory_mb
+        self.min_pages = min_pages
+        self.min_bytes = min_bytes
+
+    def supervises(self, page_count, size):
+        """
+        Whether a document is extracted in supervised worker processes
+
+        Starting a worker costs more than extracting a few pages, so small
+        documents are extracted in-process, where a pathological page is
+        not stopped.
+
+        Args:
+            page_count (int): Number of pages
+            size (int): Size of the PDF in bytes
+        """
+        return page_count >= self.min_pages or size >= self.min_bytes
+
+
+def _limit_memory(extra_mb):
+    """Cap this process's address space at its current size plus extra_mb"""
+    if resource is None or not extra_mb:
+        return
+    try:
+        with open('/proc/self/statm') as statm:
+            current = int(statm.read().split()[0]) * resource.getpagesize()
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        limit = current + extra_mb * 1024 * 1024
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    except (OSError, ValueError):
+        pass
+
+
+def _page_worker(conn, payload, indices, memory_mb):
+    """
+    Extract the pages at indices and send each one back as soon as it is done
+
+    Messages are ('ready', None, None) once the document is open, then
+    ('ok', index, text) per page, or ('memory'|'error', index, message) for a
+    page that failed. The worker exits after a memory failure so the parent
+    restarts it with a fresh heap. If the document cannot be opened at all
+    the only message is ('failed', None, message).
+    """
+    _limit_memory(memory_mb)
+    try:
+        try:
+            file = io.BytesIO(payload) if isinstance(payload, bytes) else open(payload, 'rb')
+            reader = PyPDF2.PdfReader(file)
+        except Exception as e:
+            conn.send(('failed', None, str(e) or type(e).__name__))
+            return
+
+        conn.send(('ready', None, None))
+        for index in indices:
+            try:
+                conn.send(('ok', index, reader.pages[index].extract_text() or ""))
+            except MemoryError:
+                conn.send(('memory', index, 'page exceeded its memory budget'))
+                return
+            except Exception as e:
+                conn.send(('error', index, str(e)))
+    finally:
+        conn.close()
+
+
+def _stop_worker(process):
+    if process.is_alive():
+        process.terminate()
+    process.join()
+
+
+def _supervise_pages(payload, indices, budget, deadline):
+    """
+    Run a worker process over the pages at indices, enforcing the budget
+
+    A page that runs past page_timeout or its memory budget gets its worker
+    killed. The page is recorded as skipped and a new worker resumes at the
+    next page. Once the document deadline passes, the remaining pages are
+    skipped.
+
+    Returns:
+        tuple: ({index: text}, [skipped page dicts])
+    """
+    texts = {}
+    skipped = []
+    context = process_context()
+    # next_page is the position in indices of the first page without a result
+    position = {index: offset for offset, index in enumerate(indices)}
+    next_page = 0
+    stop = len(indices)
+
+    while next_page < stop:
+        parent_conn, child_conn = context.Pipe(duplex=False)
+        process = context.Process(
+            target=_page_worker,
+            args=(child_conn, payload, indices[next_page:], budget.page_memory_mb),
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+
+        ready = False
+        try:
+            while next_page < stop:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                # Opening the document is bounded by the document deadline only
+                wait = min(budget.page_timeout, remaining) if ready else remaining
+
+                if not parent_conn.poll(wait):
+                    if remaining <= budget.page_timeout or not ready:
+                        break
+                    skipped.append({'page': indices[next_page] + 1, 'reason': 'timeout'})
+                    next_page += 1
+                    break
+
+                try:
+                    status, index, result = parent_conn.recv()
+                except EOFError:
+                    if not ready:
+                        raise PyPDF2.errors.PdfReadError("PDF worker exited before opening the document")
+                    # The worker died without reporting (e.g. killed by the OS)
+                    skipped.append({'page': indices[next_page] + 1, 'reason': 'crashed'})
+                    next_page += 1
+                    break
+
+                if status == 'failed':
+                    raise PyPDF2.errors.PdfReadError(result)
+
+                if status == 'ready':
+                    ready = True
+                    continue
+
+                if status == 'ok':
+                    texts[index] = result
+                else:
+                    skipped.append({'page': index + 1, 'reason': status, 'detail': result})
+                next_page = position[index] + 1
+
+                if status == 'memory':
+                    break
+        finally:
+            _stop_worker(process)
+            parent_conn.close()
+
+        if time.monotonic() >= deadline:
+            break
+
+    for index in indices[next_page:]:
+        skipped.append({'page': index + 1, 'reason': 'document_timeout'})
+
+    return texts, skipped
+
+
+def extract_pages_within_budget(payload, page_count, budget, workers=1, indices=None):
+    """
+    Extract the pages of a PDF without letting any page stall the caller
+
+    Args:
+        payload: Path to the PDF or its raw bytes
+        page_count (int): Number of pages in the document
+        budget (ExtractionBudget): Time and memory limits
+        workers (int): Number of page ranges supervised concurrently
+        indices (list): 0-based pages to extract, in the order wanted
+            (defaults to every page)
+
+    Returns:
+        tuple: (list of page texts, one per index, with '' for skipped
+                pages, list of skipped page dicts sorted by page number)
+    """
+    deadline = time.monotonic() + budget.document_timeout
+    indices = list(range(page_count)) if indices is None else list(indices)
+    workers = max(1, min(workers or 1, len(indices)))
+    step = -(-len(indices) // workers) if indices else 1
+    ranges = [indices[start:start + step] for start in range(0, len(indices), step)]
+
+    with ThreadPoolExecutor(max_workers=max(1, len(ranges))) as executor:
+        results = list(executor.map(
+            lambda page_range: _supervise_pages(payload, page_range, budget, deadline),
+            ranges
+        ))
+
+    texts = {}
+    skipped = []
+    for range_texts, range_skipped in results:
+        texts.update(range_texts)
+        skipped.extend(range_skipped)
+
+    skipped.sort(key=lambda entry: entry['page'])
+    return [texts.get(i, "") for i in indices], skipped
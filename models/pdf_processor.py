@@ -1,114 +1,129 @@
-import PyPDF2
-import re
-from models.general_formatter import GeneralFormatter
+from models.pdf_utils import PDFUtils
 from models.general_formatter import GeneralFormatter
+from models.rewrite_rules import RuleSet
+from models.sharded_cleanup import ShardedCleaner, collapse_run
+
+# Prefixes that PDF extraction often separates from the rest of the word
+_PREFIXES = ['de', 'in', 're', 'pre', 'pro', 'con', 'com', 'ex', 'en', 'em', 'un']
+
+# Rewrite rules applied in order by PDFProcessor._fix_word_splitting
+_WORD_SPLITTING_RULES = RuleSet([
+    # First, fix specific technical phrases
+    (r'topology\s*\(\s*as\s*shown\s*in\s*F\s*igure', 'topology (as shown in Figure'),
+    (r'data\s*and\s*decision', 'data and decision'),
+    (r'In\s*decentralized\s*systems', 'In decentralized systems'),
+    (r'The\s*topology', 'The topology'),
+    (r'It\s*may\s*be\s*any\s*existing\s*application', 'It may be any existing application'),
+    (r'Clients\s*are\s*restricted\s*using', 'Clients are restricted using'),
+    (r'Public\s+Key\s+Infrastructure\s*\(\s*PKI\s*\)', 'Public Key Infrastructure (PKI)'),
+    (r'technology\s*at\s*blockchain', 'technology at blockchain'),
+
+    # Fix words with no spaces between them
+    (r'([a-z])([A-Z])', r'\1 \2'),  # Split camelCase
+    (r'Indecentralizedsystems', r'In decentralized systems'),
+    (r'dataanddecision', r'data and decision'),
+    (r'thedataanddecisions', r'the data and decisions'),
+    (r'Itmaybeanyexistingapplication', r'It may be any existing application'),
+    (r'Clientsarerestrictedusing', r'Clients are restricted using'),
+
+    # Fix words split with spaces in the middle
+    (r'([a-z])\s+([a-z])', r'\1\2'),
+
+    # Fix words split with spaces after/before common prefixes/suffixes
+    *[(fr'{prefix}\s+([a-z])', fr'{prefix}\1') for prefix in _PREFIXES],
+
+    # Fix common patterns like "p ersonalized" -> "personalized"
+    (r'([a-z])\s+([aeiouy][a-z])', r'\1\2'),
+
+    # Fix incorrectly split words with hyphens
+    (r'([a-z])-\s*([a-z])', r'\1\2'),
+
+    # Fix technical document patterns
+    (r'F\s+igure', r'Figure'),
+    (r'as\s+shown\s+in', r'as shown in'),
+    (r'Public\s+Key\s+Infrastructure', r'Public Key Infrastructure'),
+    (r'blockchain\s+technology', r'blockchain technology'),
+    (r'data\s+and\s+decision', r'data and decision'),
+    (r'decentralized\s+systems', r'decentralized systems'),
+    (r'PKI\s+technology', r'PKI technology'),
+
+    # Fix common resume patterns
+    (r'([A-Za-z])\s+(\d{3})\s*-\s*(\d{3})\s*-\s*(\d{4})', r'\1 \2-\3-\4'),  # Phone numbers
+    (r'([A-Za-z])\s+(\d{5,6})', r'\1 \2'),  # ZIP codes
+
+    # Fix education formatting
+    (r'B\.\s*T\s*ech', r'B.Tech'),  # Fix B.Tech
+    (r'C\s*G\s*P\s*A\s*:', r'CGPA:'),  # Fix CGPA
+    (r'(\d{4})\s*-\s*(\d{4})', r'\1-\2'),  # Fix year ranges
+
+    # Fix percentage formatting
+    (r'P\s*ercentage\s*:', r'Percentage:'),
+    (r'(?<!\d)(\d+(?:\.\d+)?)\s*%', r'\1%'),  # Fix percentages
+
+    # Fix school and college names
+    (r'([a-z])college([a-z])', r'\1 College \2'),
+    (r'junior\s*college', r'Junior College'),
+    (r'([A-Za-z])\s+School', r'\1 School'),  # Fix school names
+    (r'Little\s+Flower', r'Little Flower'),  # Fix specific school name
+
+    # Fix skills section
+    (r'Skills\s+Programming', r'Skills\nProgramming'),
+    (r'Languages\s*:', r'Languages:'),
+
+    # Add spaces between sentences and sections
+    (r'\.([A-Z])', r'. \1'),
+    (r'(?<!\d)(\d+)\.(\d+)', r'\1.\2'),  # Preserve decimal points
+
+    # Final cleanup of any remaining issues
+    (r'(?<!\s)\s+-\s*\.', r'.'),  # Remove dangling hyphens
+    (r'(?<!\s)\s+\.', r'.'),  # Fix spaces before periods
+    (r'\s{2,}', r' '),  # Remove multiple spaces
+], name='pdf_processor')
+
+# The word splitting rules join words across whitespace, so the text is only
+# cut at sentence ends: whitespace between [.!?] and a capital letter. The
+# punctuation must follow a lowercase letter, digit or ')', which keeps
+# "B. Tech" together for its rule
+_SENTENCE_CUT = r'(?<=[a-z0-9)][.!?])\s+(?=[A-Z])'
+_WORD_SPLITTING_CLEANER = ShardedCleaner(_WORD_SPLITTING_RULES.apply, cut=_SENTENCE_CUT, separator=collapse_run)
 
 class PDFProcessor:
-    def extract_text(self, pdf_path):
+    def extract_text(self, pdf_path, workers=None):
         """
         Extract text from a PDF file
         
         Args:
-            pdf_path (str): Path to the PDF file
+            pdf_path: Path, bytes-like object or binary file object of the PDF
+            workers (int): Number of processes for page extraction and cleanup (optional)
             
         Returns:
             str: Extracted text from the PDF
         """
-        text = ""
-        with open(pdf_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
+        if not workers or workers <= 1:
+            # Clean pages as they are decoded: both cleaners work a shard at
+            # a time, so the raw text of the whole document is never held
+            pages = (page_text + "\n" for _, page_text in PDFUtils.iter_pages(pdf_path))
+            return "".join(GeneralFormatter.iter_format(_WORD_SPLITTING_CLEANER.iter_apply(pages)))
+        
+        text = "".join(page_text + "\n" for page_text in PDFUtils.extract_pages(pdf_path, workers))
         
         # Fix common PDF extraction issues
-        text = self._fix_word_splitting(text)
+        text = self._fix_word_splitting(text, workers)
         
         # Apply general formatter to fix spacing issues
-        text = GeneralFormatter.format_text(text)
+        text = GeneralFormatter.format_text(text, workers)
         
         return text
     
-    def _fix_word_splitting(self, text):
+    def _fix_word_splitting(self, text, workers=None):
         """
         Fix common PDF extraction issues like incorrectly split words
         
         Args:
             text (str): Raw extracted text
+            workers (int): Number of processes to shard long texts across (optional)
             
         Returns:
             str: Cleaned text with fixed word splitting
         """
-        # First, fix specific technical phrases
-        text = re.sub(r'topology\s*\(\s*as\s*shown\s*in\s*F\s*igure', 'topology (as shown in Figure', text)
-        text = re.sub(r'data\s*and\s*decision', 'data and decision', text)
-        text = re.sub(r'In\s*decentralized\s*systems', 'In decentralized systems', text)
-        text = re.sub(r'The\s*topology', 'The topology', text)
-        text = re.sub(r'It\s*may\s*be\s*any\s*existing\s*application', 'It may be any existing application', text)
-        text = re.sub(r'Clients\s*are\s*restricted\s*using', 'Clients are restricted using', text)
-        text = re.sub(r'Public\s+Key\s+Infrastructure\s*\(\s*PKI\s*\)', 'Public Key Infrastructure (PKI)', text)
-        text = re.sub(r'technology\s*at\s*blockchain', 'technology at blockchain', text)
-        
-        # Fix words with no spaces between them
-        text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)  # Split camelCase
-        text = re.sub(r'Indecentralizedsystems', r'In decentralized systems', text)
-        text = re.sub(r'dataanddecision', r'data and decision', text)
-        text = re.sub(r'thedataanddecisions', r'the data and decisions', text)
-        text = re.sub(r'Itmaybeanyexistingapplication', r'It may be any existing application', text)
-        text = re.sub(r'Clientsarerestrictedusing', r'Clients are restricted using', text)
-        
-        # Fix words split with spaces in the middle
-        text = re.sub(r'([a-z])\s+([a-z])', r'\1\2', text)
-        
-        # Fix words split with spaces after/before common prefixes/suffixes
-        prefixes = ['de', 'in', 're', 'pre', 'pro', 'con', 'com', 'ex', 'en', 'em', 'un']
-        for prefix in prefixes:
-            text = re.sub(fr'{prefix}\s+([a-z])', fr'{prefix}\1', text)
-        
-        # Fix common patterns like "p ersonalized" -> "personalized"
-        text = re.sub(r'([a-z])\s+([aeiouy][a-z])', r'\1\2', text)
-        
-        # Fix incorrectly split words with hyphens
-        text = re.sub(r'([a-z])-\s*([a-z])', r'\1\2', text)
-        
-        # Fix technical document patterns
-        text = re.sub(r'F\s+igure', r'Figure', text)
-        text = re.sub(r'as\s+shown\s+in', r'as shown in', text)
-        text = re.sub(r'Public\s+Key\s+Infrastructure', r'Public Key Infrastructure', text)
-        text = re.sub(r'blockchain\s+technology', r'blockchain technology', text)
-        text = re.sub(r'data\s+and\s+decision', r'data and decision', text)
-        text = re.sub(r'decentralized\s+systems', r'decentralized systems', text)
-        text = re.sub(r'PKI\s+technology', r'PKI technology', text)
-        
-        # Fix common resume patterns
-        text = re.sub(r'([A-Za-z])\s+(\d{3})\s*-\s*(\d{3})\s*-\s*(\d{4})', r'\1 \2-\3-\4', text)  # Phone numbers
-        text = re.sub(r'([A-Za-z])\s+(\d{5,6})', r'\1 \2', text)  # ZIP codes
-        
-        # Fix education formatting
-        text = re.sub(r'B\.\s*T\s*ech', r'B.Tech', text)  # Fix B.Tech
-        text = re.sub(r'C\s*G\s*P\s*A\s*:', r'CGPA:', text)  # Fix CGPA
-        text = re.sub(r'(\d{4})\s*-\s*(\d{4})', r'\1-\2', text)  # Fix year ranges
-        
-        # Fix percentage formatting
-        text = re.sub(r'P\s*ercentage\s*:', r'Percentage:', text)
-        text = re.sub(r'(\d+(?:\.\d+)?)\s*%', r'\1%', text)  # Fix percentages
-        
-        # Fix school and college names
-        text = re.sub(r'([a-z])college([a-z])', r'\1 College \2', text)
-        text = re.sub(r'junior\s*college', r'Junior College', text)
-        text = re.sub(r'([A-Za-z])\s+School', r'\1 School', text)  # Fix school names
-        text = re.sub(r'Little\s+Flower', r'Little Flower', text)  # Fix specific school name
-        
-        # Fix skills section
-        text = re.sub(r'Skills\s+Programming', r'Skills\nProgramming', text)
-        text = re.sub(r'Languages\s*:', r'Languages:', text)
-        
-        # Add spaces between sentences and sections
-        text = re.sub(r'\.([A-Z])', r'. \1', text)
-        text = re.sub(r'(\d+)\.(\d+)', r'\1.\2', text)  # Preserve decimal points
-        
-        # Final cleanup of any remaining issues
-        text = re.sub(r'\s+-\s*\.', r'.', text)  # Remove dangling hyphens
-        text = re.sub(r'\s+\.', r'.', text)  # Fix spaces before periods
-        text = re.sub(r'\s{2,}', r' ', text)  # Remove multiple spaces
-        
-        return text
\ No newline at end of file
+        return _WORD_SPLITTING_CLEANER.apply(text, workers)
\ No newline at end of file
@@ -1,19 +1,418 @@
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
 import PyPDF2
-from models.text_utils import TextUtils
+from models.text_utils import TextUtils, CLEANER_VERSION
+from models.text_cache import TextCache
+from models.pdf_budget import extract_pages_within_budget
+from models.process_context import process_context
+
+# Documents shorter than this are always extracted in-process, since
+# starting a process pool costs more than it saves on a few pages
+PARALLEL_MIN_PAGES = 48
+
+# Number of page ranges handed to each worker process
+RANGES_PER_WORKER = 4
+
+
+def _extract_page_range(pdf_path, start, stop):
+    """Extract pages [start, stop) of a PDF (runs inside a worker process)"""
+    with open(pdf_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def _is_path(source):
+    return isinstance(source, (str, os.PathLike))
+
+
+def _source_size(source):
+    """Size of a PDF source in bytes"""
+    if _is_path(source):
+        return os.path.getsize(source)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return len(source)
+    source.seek(0, os.SEEK_END)
+    size = source.tell()
+    source.seek(0)
+    return size
+
+
+@contextmanager
+def _open_source(source):
+    """
+    Open a PDF source as a binary file object
+
+    A source is a filesystem path, a bytes-like object (bytes, bytearray,
+    memoryview) or a seekable binary file object such as an upload stream.
+    File objects are rewound but left open for the caller to close.
+    """
+    if _is_path(source):
+        with open(source, 'rb') as file:
+            yield file
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(source)
+    else:
+        source.seek(0)
+        yield source
+
+
+class LazyPDF:
+    """Random access to a PDF's pages that decodes each page only on request"""
+
+    def __init__(self, source, budget=None, workers=None):
+        """
+        Args:
+            source: Path, bytes-like object or binary file object
+            budget (ExtractionBudget): Time and memory limits; pages are then
+                decoded in supervised worker processes (unless the document
+                is below the budget's size thresholds) and pages over the
+                limits are skipped
+            workers (int): Number of worker processes used with a budget
+        """
+        self._texts = {}
+        self.skipped_pages = []
+        self._pdf = source
+        self._budget = budget
+        self._workers = workers
+
+        # Closes the file if anything below fails, and in close() otherwise
+        with ExitStack() as stack:
+            self._file = stack.enter_context(_open_source(source))
+            self.reader = PyPDF2.PdfReader(self._file)
+            self._supervised = budget is not None and budget.supervises(self.page_count, _source_size(source))
+            self._stack = stack.pop_all()
+
+    @property
+    def page_count(self):
+        """Number of pages, read from the page tree without decoding any text"""
+        return len(self.reader.pages)
+
+    def page_text(self, index):
+        """Text of one page (0-based), decoded on first access and memoized"""
+        return self.page_texts([index])[0]
+
+    def page_texts(self, indices):
+        """
+        Texts of several pages (0-based), decoding the missing ones together
+
+        With a budget, the missing pages go to the supervised workers in one
+        batch; a skipped page reads as '' and is listed in skipped_pages.
+        """
+        missing = [index for index in dict.fromkeys(indices) if index not in self._texts]
+        if missing and self._supervised:
+            texts, skipped = PDFUtils.extract_pages_within_budget(
+                self._pdf, self._budget, self._workers, self.page_count, missing
+            )
+            self._texts.update(zip(missing, texts))
+            self.skipped_pages = sorted(self.skipped_pages + skipped, key=lambda entry: entry['page'])
+        else:
+            for index in missing:
+                self._texts[index] = self.reader.pages[index].extract_text() or ""
+        return [self._texts[index] for index in indices]
+
+    def page_range(self, start, stop):
+        """Texts of pages [start, stop)"""
+        return self.page_texts(range(start, min(stop, self.page_count)))
+
+    @property
+    def pages_decoded(self):
+        """Number of pages whose text has been decoded so far"""
+        return len(self._texts) - len(self.skipped_pages)
+
+    def close(self):
+        self._stack.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
 
 class PDFUtils:
     """Simplified PDF utilities for extracting and processing PDF content"""
-    
+
     @staticmethod
-    def extract_text(pdf_path):
-        """Extract text from a PDF file and fix common formatting issues"""
-        text = ""
-        with open(pdf_path, 'rb') as file:
+    def probe(source):
+        """
+        Read page count and document metadata without decoding any page text
+
+        Args:
+            source: Path, bytes-like object or binary file object
+
+        Returns:
+            dict: 'page_count', 'encrypted' and 'metadata' (str values)
+        """
+        with _open_source(source) as file:
+            reader = PyPDF2.PdfReader(file)
+            metadata = reader.metadata or {}
+            return {
+                'page_count': len(reader.pages),
+                'encrypted': reader.is_encrypted,
+                'metadata': {key.lstrip('/'): str(value) for key, value in metadata.items()}
+            }
+
+    @staticmethod
+    def read_outline(source):
+        """
+        Read the top-level entries of a PDF's outline (bookmarks)
+
+        Args:
+            source: Path, bytes-like object or binary file object
+
+        Returns:
+            list: (title, page_index) tuples with 0-based page indices;
+                empty if the PDF has no usable outline
+        """
+        with _open_source(source) as file:
             reader = PyPDF2.PdfReader(file)
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-        
-        # Fix spacing issues
-        text = TextUtils.fix_spacing(text)
-        
-        return text
\ No newline at end of file
+            try:
+                outline = reader.outline
+            except Exception as e:
+                print(f"Could not read PDF outline: {str(e)}")
+                return []
+
+            entries = []
+            for item in outline:
+                # Nested lists hold sub-sections of the preceding entry
+                if isinstance(item, list):
+                    continue
+                try:
+                    page_index = reader.get_destination_page_number(item)
+                except Exception:
+                    continue
+                if page_index is not None and page_index >= 0:
+                    entries.append((str(item.title), page_index))
+            return entries
+
+    @staticmethod
+    def iter_pages(source):
+        """
+        Yield the text of a PDF one page at a time
+
+        Pages are decoded lazily, so callers can start cleaning or counting
+        words before the rest of the document has been parsed.
+
+        Args:
+            source: Path, bytes-like object or binary file object
+
+        Yields:
+            tuple: (page_number, text) with 1-based page numbers
+        """
+        with _open_source(source) as file:
+            reader = PyPDF2.PdfReader(file)
+            for page_number, page in enumerate(reader.pages, start=1):
+                yield page_number, page.extract_text() or ""
+
+    @staticmethod
+    def iter_text(source, profile='auto'):
+        """
+        Yield the cleaned text of a PDF as its pages are decoded
+
+        Each page is cleaned once enough text for a shard has arrived, so
+        neither the raw nor the cleaned text of the whole document is held.
+
+        Args:
+            source: Path, bytes-like object or binary file object
+            profile (str): Cleanup profile, or 'auto' to choose one from the
+                leading pages (see TextUtils.iter_clean)
+
+        Yields:
+            str: Cleaned text, cut at whitespace, in document order
+        """
+        pages = (page_text + "\n" for _, page_text in PDFUtils.iter_pages(source))
+        yield from TextUtils.iter_clean(pages, profile)
+
+    @staticmethod
+    def extract_pages(source, workers=None):
+        """
+        Extract the text of every page, optionally across several processes
+
+        Args:
+            source: Path, bytes-like object or binary file object
+            workers (int): Number of worker processes; None or 1 keeps
+                extraction in-process. Only path sources are extracted in
+                parallel, since workers reopen the file themselves.
+
+        Returns:
+            list: Page texts in document order
+        """
+        if not workers or workers <= 1 or not _is_path(source):
+            return [page_text for _, page_text in PDFUtils.iter_pages(source)]
+
+        with open(source, 'rb') as file:
+            page_count = len(PyPDF2.PdfReader(file).pages)
+
+        if page_count < PARALLEL_MIN_PAGES:
+            return [page_text for _, page_text in PDFUtils.iter_pages(source)]
+
+        # Split the document into contiguous page ranges; map() returns
+        # results in submission order, so pages come back in order
+        num_ranges = min(page_count, workers * RANGES_PER_WORKER)
+        step = -(-page_count // num_ranges)
+        starts = list(range(0, page_count, step))
+        stops = [min(start + step, page_count) for start in starts]
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(starts)), mp_context=process_context()) as executor:
+            results = executor.map(_extract_page_range, [source] * len(starts), starts, stops)
+            pages = []
+            for page_range in results:
+                pages.extend(page_range)
+
+        return pages
+
+    @staticmethod
+    def source_digest(source):
+        """SHA-256 hex digest of a PDF source's bytes"""
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return TextCache.digest(source)
+        with _open_source(source) as file:
+            return TextCache.digest_stream(file)
+
+    @staticmethod
+    def extract_pages_within_budget(source, budget, workers=None, page_count=None, indices=None):
+        """
+        Extract pages in supervised worker processes
+
+        Pages that exceed the budget's time or memory limits are skipped
+        instead of stalling the caller.
+
+        Args:
+            source: Path, bytes-like object or binary file object
+            budget (ExtractionBudget): Time and memory limits
+            workers (int): Number of page ranges extracted concurrently
+            page_count (int): Number of pages, if the caller already has it
+            indices (list): 0-based pages to extract (defaults to every page)
+
+        Returns:
+            tuple: (page texts, one per page extracted, with '' for skipped
+                pages, skipped page dicts)
+        """
+        if _is_path(source) or isinstance(source, bytes):
+            payload = source
+        else:
+            with _open_source(source) as file:
+                payload = file.read()
+
+        if page_count is None:
+            page_count = PDFUtils.probe(source)['page_count']
+        if (page_count if indices is None else len(indices)) < PARALLEL_MIN_PAGES:
+            workers = 1
+
+        return extract_pages_within_budget(payload, page_count, budget, workers, indices)
+
+    @staticmethod
+    def cache_key(digest, profile='auto'):
+        """
+        Cache key of a PDF's cleaned text
+
+        Text cleaned by another cleaner version or with another profile is
+        stored under another key.
+
+        Args:
+            digest (str): SHA-256 of the PDF bytes
+            profile (str): Requested cleanup profile, 'auto' included
+
+        Returns:
+            str: The key
+        """
+        return f"{digest}-v{CLEANER_VERSION}-{profile}"
+
+    @staticmethod
+    def cached_document(cache, cache_key, profile='auto'):
+        """
+        Look up the cleaned text of a PDF without opening the PDF
+
+        Args:
+            cache (TextCache): Cache of cleaned text
+            cache_key (str): SHA-256 of the PDF bytes
+            profile (str): Cleanup profile requested when the text was
+                stored ('auto' included)
+
+        Returns:
+            dict: Like extract_document's result, with 'pages' None; None
+                on a miss
+        """
+        entry = cache.get(PDFUtils.cache_key(cache_key, profile))
+        if entry is None:
+            return None
+        return {'text': entry['text'], 'pages': None, 'page_count': entry['page_count'],
+                'skipped_pages': [], 'cleanup_profile': entry['cleanup_profile']}
+
+    @staticmethod
+    def extract_document(source, workers=None, cache=None, cache_key=None, budget=None, profile='auto',
+                         page_count=None, lookup=True):
+        """
+        Extract and clean the text of a PDF, reporting any skipped pages
+
+        Args:
+            source: Path, bytes-like object or binary file object
+            workers (int): Number of processes for page extraction and cleanup (optional)
+            cache (TextCache): Cache of cleaned text to consult first and
+                store the result in (optional)
+            cache_key (str): SHA-256 of the PDF bytes, if the caller already has it
+            budget (ExtractionBudget): Per-page and per-document limits
+                (optional); documents below its size thresholds are
+                extracted in-process
+            profile (str): Cleanup profile ('full', 'light', 'none'), or
+                'auto' to choose one from a sample of the extracted text
+            page_count (int): Number of pages, if the caller already has it
+            lookup (bool): Consult the cache first; False when the caller
+                has just missed it and only wants the result stored
+
+        Returns:
+            dict: 'text' (cleaned text), 'pages' (raw page texts, or None
+                when served from the cache), 'page_count', 'skipped_pages'
+                (list of dicts with 1-based 'page' and a 'reason') and
+                'cleanup_profile' (the profile the text was cleaned with)
+        """
+        if cache is not None:
+            cache_key = cache_key or PDFUtils.source_digest(source)
+            cached = PDFUtils.cached_document(cache, cache_key, profile) if lookup else None
+            if cached is not None:
+                return cached
+
+        if budget is not None and page_count is None:
+            page_count = PDFUtils.probe(source)['page_count']
+        if budget is not None and budget.supervises(page_count, _source_size(source)):
+            pages, skipped_pages = PDFUtils.extract_pages_within_budget(source, budget, workers, page_count)
+        else:
+            pages, skipped_pages = PDFUtils.extract_pages(source, workers), []
+
+        text = "".join(page_text + "\n" for page_text in pages)
+
+        # Fix spacing issues as far as the text needs it, sharding long
+        # documents across the same workers
+        text, cleanup_profile = TextUtils.clean_extracted_text(text, workers, profile)
+
+        # Partial extractions are not cached, so a later upload gets another try
+        if cache is not None and not skipped_pages:
+            cache.put(PDFUtils.cache_key(cache_key, profile),
+                      {'text': text, 'cleanup_profile': cleanup_profile, 'page_count': len(pages)})
+
+        return {'text': text, 'pages': pages, 'page_count': len(pages), 'skipped_pages': skipped_pages,
+                'cleanup_profile': cleanup_profile}
+
+    @staticmethod
+    def extract_text(source, workers=None, cache=None, cache_key=None, budget=None, profile='auto'):
+        """
+        Extract text from a PDF and fix common formatting issues
+
+        Args:
+            source: Path, bytes-like object or binary file object
+            workers (int): Number of processes for page extraction (optional)
+            cache (TextCache): Cache of cleaned text to consult first (optional)
+            cache_key (str): SHA-256 of the PDF bytes, if the caller already has it
+            budget (ExtractionBudget): Per-page and per-document limits (optional)
+            profile (str): Cleanup profile, or 'auto' to choose one
+
+        Returns:
+            str: Cleaned text of the whole document
+        """
+        # Without a cache, budget or workers, pages are cleaned as they are
+        # decoded instead of after the whole document has been read
+        if cache is None and budget is None and (not workers or workers <= 1):
+            return "".join(PDFUtils.iter_text(source, profile))
+        return PDFUtils.extract_document(source, workers, cache, cache_key, budget, profile)['text']
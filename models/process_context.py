@@ -0,0 +1,25 @@
+import multiprocessing
+
+# Start method for worker processes. The app serves requests from threads,
+# and forking a threaded process can copy a lock another thread holds, so
+# workers start from a clean interpreter instead.
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+# Modules the fork server imports once, so its workers start with them
+# loaded instead of importing them per process
+PRELOAD_MODULES = [
+    'models.pdf_budget',
+    'models.pdf_utils',
+    'models.sharded_cleanup',
+    'models.chapter_splitter',
+    'models.pdf_processor',
+    'models.general_formatter',
+]
+
+
+def process_context():
+    """Multiprocessing context that every worker process is started from"""
+    context = multiprocessing.get_context(START_METHOD)
+    if START_METHOD == 'forkserver':
+        context.set_forkserver_preload(PRELOAD_MODULES)
+    return context
@@ -0,0 +1,249 @@
+import json
+import re
+import threading
+import time
+
+# Characters that make a pattern a real regex rather than a plain string
+_REGEX_METACHARS = set('.^$*+?{}[]\\|()')
+
+# Non-ASCII characters that re.IGNORECASE matches against ASCII letters
+_ASCII_FOLD = str.maketrans({'\u0130': 'i', '\u0131': 'i', '\u017f': 's', '\u212a': 'k'})
+
+# Every RuleSet created in this process, for reporting rule statistics
+RULE_SETS = []
+
+# Per-rule statistics are only recorded while instrumentation is on
+_instrumentation = {'enabled': False}
+_stats_lock = threading.Lock()
+
+
+class RewriteRule:
+    """A single pattern -> replacement rule"""
+
+    def __init__(self, pattern, replacement, flags=0):
+        self.pattern = pattern
+        self.replacement = replacement
+        self.flags = flags
+        self.compiled = re.compile(pattern, flags)
+        self.reset_stats()
+
+        # A rule is literal when neither side uses regex syntax; only
+        # IGNORECASE is supported for literal rules, and only for ASCII
+        self.literal = (
+            bool(pattern)
+            and not _REGEX_METACHARS.intersection(pattern)
+            and '\\' not in replacement
+            and flags & ~re.IGNORECASE == 0
+            and (not flags & re.IGNORECASE or pattern.isascii())
+        )
+
+    def key(self, value):
+        """Normalize a pattern or replacement for case-insensitive searches"""
+        return value.translate(_ASCII_FOLD).lower() if self.flags & re.IGNORECASE else value
+
+    def apply(self, text):
+        return self.compiled.sub(self.replacement, text)
+
+    def apply_counted(self, text):
+        """
+        Apply the rule, also measuring what it rewrote
+
+        Returns:
+            tuple: (new text, number of matches, UTF-8 bytes of matched text)
+        """
+        if self.literal and not self.flags:
+            matches = text.count(self.pattern)
+            if not matches:
+                return text, 0, 0
+            return text.replace(self.pattern, self.replacement), matches, matches * len(self.pattern.encode('utf-8'))
+
+        sizes = []
+
+        def replace(match):
+            sizes.append(len(match.group(0).encode('utf-8')))
+            return match.expand(self.replacement)
+
+        return self.compiled.sub(replace, text), len(sizes), sum(sizes)
+
+    def record(self, matches, size, seconds):
+        with _stats_lock:
+            self.calls += 1
+            self.matches += matches
+            self.bytes_rewritten += size
+            self.seconds += seconds
+
+    def reset_stats(self):
+        with _stats_lock:
+            self.calls = 0
+            self.matches = 0
+            self.bytes_rewritten = 0
+            self.seconds = 0.0
+
+
+class _RegexPass:
+    """One regex rule applied on its own"""
+
+    def __init__(self, rule):
+        self.rules = [rule]
+
+    def apply(self, text):
+        return self.rules[0].apply(text)
+
+
+class _LiteralPass:
+    """
+    A run of consecutive literal rules applied as one table
+
+    Each rule is guarded by a substring test, so a rule whose pattern does
+    not occur costs a single fast search instead of a regex scan. Rules
+    still run in table order, so the result is the same as running every
+    rule through re.sub in turn.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.ignorecase = bool(rules[0].flags & re.IGNORECASE)
+
+    def accepts(self, rule):
+        return rule.literal and bool(rule.flags & re.IGNORECASE) == self.ignorecase
+
+    def add(self, rule):
+        self.rules.append(rule)
+
+    def apply(self, text):
+        if not self.ignorecase:
+            for rule in self.rules:
+                if rule.pattern in text:
+                    text = text.replace(rule.pattern, rule.replacement)
+            return text
+
+        # Search a case-folded copy, refreshed only after a rule fires
+        folded = text.translate(_ASCII_FOLD).lower()
+        for rule in self.rules:
+            if rule.key(rule.pattern) in folded:
+                text = rule.apply(text)
+                folded = text.translate(_ASCII_FOLD).lower()
+        return text
+
+
+class RuleSet:
+    """
+    An ordered table of rewrite rules compiled into as few passes as possible
+
+    Rules are (pattern, replacement) or (pattern, replacement, flags) tuples
+    with re.sub semantics. Each run of consecutive literal rules becomes one
+    table of guarded string replacements; every other rule keeps its own
+    precompiled pass. The output is identical to applying the rules one at
+    a time in table order.
+    """
+
+    def __init__(self, rules, name=None):
+        self.name = name
+        self.calls = 0
+        self.rules = [RewriteRule(*rule) for rule in rules]
+        self.passes = []
+        for rule in self.rules:
+            last = self.passes[-1] if self.passes else None
+            if isinstance(last, _LiteralPass) and last.accepts(rule):
+                last.add(rule)
+            elif rule.literal:
+                self.passes.append(_LiteralPass([rule]))
+            else:
+                self.passes.append(_RegexPass(rule))
+        RULE_SETS.append(self)
+
+    def apply(self, text):
+        """Apply every rule to text"""
+        if _instrumentation['enabled']:
+            return self.apply_instrumented(text)
+        for rule_pass in self.passes:
+            text = rule_pass.apply(text)
+        return text
+
+    def apply_instrumented(self, text):
+        """
+        Apply the rules one at a time, recording each rule's matches,
+        rewritten bytes and time
+
+        Slower than apply(), but the output is the same.
+        """
+        with _stats_lock:
+            self.calls += 1
+        for rule in self.rules:
+            start = time.perf_counter()
+            text, matches, size = rule.apply_counted(text)
+            rule.record(matches, size, time.perf_counter() - start)
+        return text
+
+    def stats(self):
+        """
+        Statistics recorded for each rule since the last reset
+
+        Returns:
+            dict: 'name', 'calls' and 'rules', a list of dicts with the
+                rule's 'index', 'pattern', 'matches', 'bytes_rewritten'
+                and 'seconds' in table order
+        """
+        with _stats_lock:
+            return {
+                'name': self.name,
+                'calls': self.calls,
+                'rules': [{
+                    'index': index,
+                    'pattern': rule.pattern,
+                    'matches': rule.matches,
+                    'bytes_rewritten': rule.bytes_rewritten,
+                    'seconds': rule.seconds
+                } for index, rule in enumerate(self.rules)]
+            }
+
+    def reset_stats(self):
+        with _stats_lock:
+            self.calls = 0
+        for rule in self.rules:
+            rule.reset_stats()
+
+    def apply_sequential(self, text):
+        """Apply the rules one re.sub at a time (the uncompiled reference path)"""
+        for rule in self.rules:
+            text = re.sub(rule.pattern, rule.replacement, text, flags=rule.flags)
+        return text
+
+
+def set_instrumentation(enabled):
+    """
+    Turn per-rule statistics on or off for every RuleSet in this process
+
+    Statistics accumulate across calls (and requests) until reset_stats()
+    is called. Rules applied in worker processes are not counted.
+    """
+    _instrumentation['enabled'] = bool(enabled)
+
+
+def instrumentation_enabled():
+    return _instrumentation['enabled']
+
+
+def reset_stats():
+    """Clear the statistics of every RuleSet"""
+    for rule_set in RULE_SETS:
+        rule_set.reset_stats()
+
+
+def collect_stats():
+    """
+    Statistics of every RuleSet
+
+    Returns:
+        dict: 'enabled' and 'rule_sets', a list of RuleSet.stats() dicts
+    """
+    return {
+        'enabled': instrumentation_enabled(),
+        'rule_sets': [rule_set.stats() for rule_set in RULE_SETS]
+    }
+
+
+def dump_stats(path):
+    """Write collect_stats() to a JSON file"""
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(collect_stats(), file, indent=2)
@@ -0,0 +1,166 @@
+import re
+from concurrent.futures import ProcessPoolExecutor
+from models.rewrite_rules import instrumentation_enabled
+from models.process_context import process_context
+
+# Texts shorter than this are cleaned in-process, since starting a process
+# pool costs more than it saves on a few pages
+PARALLEL_MIN_CHARS = 256 * 1024
+
+# Smallest shard handed to a worker process
+SHARD_MIN_CHARS = 64 * 1024
+
+# Number of shards handed to each worker process
+SHARDS_PER_WORKER = 4
+
+# Characters of a streamed document buffered before a shard is cut off
+STREAM_SHARD_CHARS = 64 * 1024
+
+# Any whitespace run between two non-whitespace characters
+WHITESPACE_CUT = r'(?<=\S)\s+(?=\S)'
+
+
+def collapse_run(run):
+    """Separator for a cut whose whitespace run becomes one space if it is 2+ characters long"""
+    return ' ' if len(run) >= 2 else run
+
+
+def single_space(run):
+    """Separator for a cut whose whitespace run always becomes one space"""
+    return ' '
+
+
+def _clean_shard(clean, text):
+    """Clean one shard of a document (runs inside a worker process)"""
+    return clean(text)
+
+
+class ShardedCleaner:
+    """
+    Run a text cleaner over shards of a long document on a process pool
+
+    A cleaner can only be cut where none of its rules can match across the
+    cut, so each cleaner comes with a pattern for such safe cuts: whitespace
+    runs for which clean(a + run + b) == clean(a) + separator(run) + clean(b).
+    Shards are fixed-size, and the fragment after a shard's last safe cut
+    (a word hyphenated across a page break, say) is carried into the next
+    shard, so the stitched output matches cleaning the whole text at once.
+    """
+
+    def __init__(self, clean, cut=WHITESPACE_CUT, separator=collapse_run):
+        """
+        Args:
+            clean (callable): Cleaner taking and returning a str; it must be
+                picklable (a module-level function or staticmethod)
+            cut (str): Regex matching the whole of a whitespace run where the
+                text may be cut; lookarounds keep it from matching part of a run
+            separator (callable): Maps the matched run to the text the cleaner
+                leaves in its place
+        """
+        self.clean = clean
+        self.cut = re.compile(cut)
+        self.separator = separator
+
+    def split(self, text, shard_chars):
+        """
+        Cut text into shards of at least shard_chars characters
+
+        Args:
+            text (str): Text to cut
+            shard_chars (int): Target shard size
+
+        Returns:
+            tuple: (shards, separators) with one separator between each pair
+                of consecutive shards
+        """
+        shards = []
+        separators = []
+        start = 0
+        while len(text) - start > shard_chars:
+            match = self.cut.search(text, start + shard_chars)
+            if match is None:
+                break
+            shards.append(text[start:match.start()])
+            separators.append(self.separator(match.group(0)))
+            start = match.end()
+        shards.append(text[start:])
+        return shards, separators
+
+    def apply(self, text, workers=None):
+        """
+        Clean text, sharding it across worker processes when it is long
+
+        Args:
+            text (str): Text to clean
+            workers (int): Number of worker processes; None or 1 cleans
+                in-process, as does running with rule statistics on
+
+        Returns:
+            str: The same output as clean(text)
+        """
+        # Rule statistics are only recorded in this process, so instrumented
+        # runs stay in-process
+        if not workers or workers <= 1 or len(text) < PARALLEL_MIN_CHARS or instrumentation_enabled():
+            return self.clean(text)
+
+        shard_chars = max(SHARD_MIN_CHARS, len(text) // (workers * SHARDS_PER_WORKER))
+        shards, separators = self.split(text, shard_chars)
+        if len(shards) == 1:
+            return self.clean(text)
+
+        # map() returns results in submission order, so shards come back in order
+        with ProcessPoolExecutor(max_workers=min(workers, len(shards)), mp_context=process_context()) as executor:
+            cleaned = list(executor.map(_clean_shard, [self.clean] * len(shards), shards))
+
+        pieces = [cleaned[0]]
+        for separator, shard in zip(separators, cleaned[1:]):
+            pieces.append(separator)
+            pieces.append(shard)
+        return ''.join(pieces)
+
+    def iter_apply(self, pieces, shard_chars=STREAM_SHARD_CHARS):
+        """
+        Clean a document that arrives in pieces (pages, say) one shard at a time
+
+        Pieces are buffered until a safe cut lies shard_chars or more into
+        the buffer; the text before the cut is cleaned and yielded with its
+        separator, so only about one shard of the document is held at once.
+
+        Args:
+            pieces (iterable): Consecutive pieces of the text
+            shard_chars (int): Target shard size
+
+        Yields:
+            str: Cleaned text; joined, the same output as clean() of the
+                whole text
+        """
+        buffer = ""
+        for piece in pieces:
+            # Cuts before the trailing whitespace run were already searched for
+            start = len(buffer)
+            while start > 0 and buffer[start - 1].isspace():
+                start -= 1
+            start = max(shard_chars, start)
+            buffer += piece
+
+            while len(buffer) > shard_chars:
+                match = self.cut.search(buffer, start)
+                if match is None:
+                    break
+                yield self.clean(buffer[:match.start()]) + self.separator(match.group(0))
+                buffer = buffer[match.end():]
+                start = shard_chars
+        yield self.clean(buffer)
+
+    def apply_pages(self, pages, workers=None):
+        """
+        Clean the text of a document given as page texts
+
+        Args:
+            pages (list): Page texts, each followed by a newline in the document
+            workers (int): Number of worker processes (optional)
+
+        Returns:
+            str: Cleaned text of the whole document
+        """
+        return self.apply("".join(page_text + "\n" for page_text in pages), workers)
@@ -1,4 +1,8 @@
 import re
+from models.word_boundaries import BoundaryInserter, COMMON_WORDS
+
+# Splits dictionary words that PDF extraction ran together
+_WORD_BOUNDARIES = BoundaryInserter(COMMON_WORDS)
 
 class SimpleSummarizer:
     """A simple extractive summarizer that doesn't rely on external libraries"""
@@ -76,24 +80,8 @@ class SimpleSummarizer:
         text = re.sub(r'\s+', ' ', text)  # Replace multiple spaces with single space
         text = re.sub(r'\n+', ' ', text)  # Replace newlines with spaces
         
-        # Common word boundaries to check
-        common_words = [
-            "blockchain", "technology", "data", "decision", "systems", 
-            "public", "key", "infrastructure", "network", "transaction",
-            "consensus", "node", "client", "application", "process",
-            "database", "ledger", "block", "hash", "security",
-            "distributed", "decentralized", "centralized", "figure",
-            "shown", "topology", "platform", "hyperledger", "ethereum",
-            "bitcoin", "smart", "contract", "proof", "work", "stake",
-            "private", "consortium", "permissioned", "permissionless"
-        ]
-        
         # Add spaces between common words
-        for i, word1 in enumerate(common_words):
-            for word2 in common_words:
-                if word1 != word2:
-                    pattern = f"({word1})({word2})"
-                    text = re.sub(pattern, r"\1 \2", text, flags=re.IGNORECASE)
+        text = _WORD_BOUNDARIES.apply(text)
         
         # Add spaces between lowercase and uppercase letters (camelCase)
         text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)
@@ -1,84 +1,315 @@
+import re
+from functools import partial
 from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
 import langid
+from models.text_utils import TextUtils
+from models.document import SENTENCE_BOUNDARY
+from models.rewrite_rules import RuleSet
+from models.inference_server import InferenceServer
+from models.model_pool import ModelPool, ModelHandle
+from models.inference_backends import BACKENDS, load_pipeline
+
+# Rewrite rules applied by Summarizer._clean_text_for_summarization before
+# whitespace is collapsed
+_CLEANUP_RULES = RuleSet([
+    # First, fix specific technical document issues
+    (r'topology\s*\(\s*as\s*shown\s*in\s*F\s*igure', 'topology (as shown in Figure'),
+    (r'data\s*and\s*decision', 'data and decision'),
+    (r'In\s*decentralized\s*systems', 'In decentralized systems'),
+    (r'The\s*topology', 'The topology'),
+    (r'It\s*may\s*be\s*any\s*existing\s*application', 'It may be any existing application'),
+    (r'Clients\s*are\s*restricted\s*using', 'Clients are restricted using'),
+    (r'Public\s+Key\s+Infrastructure\s*\(\s*PKI\s*\)', 'Public Key Infrastructure (PKI)'),
+    (r'technology\s*at\s*blockchain', 'technology at blockchain'),
+
+    # Fix words with no spaces between them
+    (r'([a-z])([A-Z])', r'\1 \2'),  # Split camelCase
+    (r'Indecentralizedsystems', r'In decentralized systems'),
+    (r'dataanddecision', r'data and decision'),
+    (r'thedataanddecisions', r'the data and decisions'),
+    (r'Itmaybeanyexistingapplication', r'It may be any existing application'),
+    (r'Clientsarerestrictedusing', r'Clients are restricted using'),
+
+    # Fix common resume formatting issues
+    (r'([a-z])\s+([a-z])', r'\1\2'),  # Fix split words
+
+    # Fix education formatting
+    (r'B\.\s*T\s*ech', r'B.Tech'),
+    (r'C\s*G\s*P\s*A\s*:', r'CGPA:'),
+    (r'(\d{4})\s*-\s*(\d{4})', r'\1-\2'),
+
+    # Fix percentage formatting
+    (r'P\s*ercentage\s*:', r'Percentage:'),
+    (r'(?<!\d)(\d+(?:\.\d+)?)\s*%', r'\1%'),  # Fix percentages
+
+    # Fix school and college names
+    (r'([a-z])college([a-z])', r'\1 College \2'),
+    (r'junior\s*college', r'Junior College'),
+    (r'Srichaithanya', r'Sri Chaithanya'),
+    (r'([A-Za-z])\s+School', r'\1 School'),  # Fix school names
+    (r'Little\s+Flower', r'Little Flower'),  # Fix specific school name
+
+    # Fix skills section
+    (r'Skills\s+Programming', r'Skills\nProgramming'),
+    (r'Languages\s*:', r'Languages:'),
+    (r'([A-Za-z]),\s*([A-Za-z])', r'\1, \2'),  # Fix comma-separated lists
+
+    # Add proper spacing for sentences and sections
+    (r'\.([A-Z])', r'. \1'),
+    (r'(\d)\s*([A-Z])', r'\1. \2'),
+    (r'(?<!\d)(\d+)\.(\d+)', r'\1.\2'),  # Preserve decimal points
+
+    # Format address and postal code
+    (r'(Bapatla,\s*Andhra\s*Pradesh)\s*-\s*(\d{6})', r'\1 - \2'),
+], name='summarizer_cleanup')
+
+# Rewrite rules applied by Summarizer._clean_text_for_summarization after
+# whitespace is collapsed
+_CLEANUP_FINAL_RULES = RuleSet([
+    # Remove very long concatenated words (likely errors)
+    (r'\b\w{40,}\b', ''),
+
+    # Fix common resume patterns
+    (r'([A-Za-z])\s+(\d{3})\s*-\s*(\d{3})\s*-\s*(\d{4})', r'\1 \2-\3-\4'),  # Phone numbers
+
+    # Add line breaks for better readability in education sections
+    (r'(B\.Tech|CGPA|Degree|Percentage|Skills)', r'\n\1'),
+
+    # Final cleanup of any remaining issues
+    (r'(?<!\s)\s+-\s*\.', r'.'),  # Remove dangling hyphens
+    (r'(?<!\s)\s+\.', r'.'),  # Fix spaces before periods
+], name='summarizer_cleanup_final')
+
+# Section headings that start a new paragraph in a summary
+_SECTIONS = ['Education:', 'Skills:', 'Experience:', 'Projects:', 'Percentage:', 'CGPA:']
+
+# Rewrite rules applied in order by Summarizer._post_process_summary
+_SUMMARY_RULES = RuleSet([
+    # Fix specific technical document issues
+    (r'dataanddecision', r'data and decision'),
+    (r'Indecentralizedsystems', r'In decentralized systems'),
+    (r'thedataanddecisions', r'the data and decisions'),
+    (r'Itmaybeanyexistingapplication', r'It may be any existing application'),
+    (r'Clientsarerestrictedusing', r'Clients are restricted using'),
+    (r'atblockchain', r'at blockchain'),
+    (r'Thetopology', r'The topology'),
+
+    # Fix common formatting issues
+    (r'(?<!\d)(\d+(?:\.\d+)?)\s*%', r'\1%'),
+    (r'P\s+ercentage', r'Percentage'),
+    (r'Little\s+Flower', r'Little Flower'),
+    (r'Skills\s+Programming', r'Skills: Programming'),
+    (r'(Bapatla,\s*Andhra\s*Pradesh)\s*-\s*(\d{6})', r'\1 - \2'),
+
+    # Fix technical document formatting
+    (r'F\s+igure', r'Figure'),
+    (r'as\s+shown\s+in', r'as shown in'),
+    (r'Public\s+Key\s+Infrastructure', r'Public Key Infrastructure'),
+    (r'PKI\s+technology', r'PKI technology'),
+    (r'blockchain\s+technology', r'blockchain technology'),
+    (r'data\s+and\s+decision', r'data and decision'),
+    (r'decentralized\s+systems', r'decentralized systems'),
+    (r'topology\s+\(asshownin', r'topology (as shown in'),
+
+    # Fix spacing and punctuation
+    (r'([A-Za-z]),([A-Za-z])', r'\1, \2'),
+    (r'(?<!\s)\s+-\s*\.', r'.'),  # Remove "- ."
+    (r'(?<!\s)\s+\.', r'.'),  # Fix spaces before periods
+
+    # Add line breaks for better readability
+    *[(fr'([.!?])\s*({section})', r'\1\n\n\2') for section in _SECTIONS],
+], name='summarizer_post')
+
+# Ways generate_summary handles a document longer than one model window:
+# 'select' keeps a few chunks by position, 'map_reduce' summarizes every
+# chunk and then the summaries of the summaries
+SUMMARY_STRATEGIES = ('select', 'map_reduce')
+
+# Words in a document above which the 'select' strategy keeps only some
+# of its chunks
+WINDOW_WORDS = 1024
+
+# Words per chunk when no tokenizer is loaded to count model tokens
+CHUNK_WORDS = 800
+
+# Most chunks the 'select' strategy keeps per summary length; chunks are
+# sized so that this many fit in one model input together
+SELECT_CHUNKS = {
+    'short': 2,
+    'medium': 3,
+    'long': 5
+}
+
+# Input length assumed for a model whose tokenizer reports no limit
+DEFAULT_MAX_INPUT_TOKENS = 1024
+
+# Tokenizers without a length limit report a huge sentinel instead
+_UNLIMITED_TOKENS = 1_000_000
+
+# Token length bounds of each partial summary in map-reduce; chunks shorter
+# than the upper bound are passed on unchanged
+PARTIAL_MAX_LENGTH = 150
+PARTIAL_MIN_LENGTH = 40
+
+# Chunks per pipeline call in map-reduce
+MAP_REDUCE_BATCH_SIZE = 8
+
+# Input each model is run on once when it is warmed up
+WARMUP_TEXT = (
+    "Blockchain technology stores records in a shared ledger that is replicated "
+    "across many computers. Each block links to the previous one, so past records "
+    "cannot be changed without the agreement of the network."
+)
 
 class Summarizer:
-    def __init__(self):
-        # Initialize models - using smaller, faster models
+    def __init__(self, batch_size=MAP_REDUCE_BATCH_SIZE, model_pool=None):
+        # Initialize models - using smaller, faster models; 'backend' is one
+        # of inference_backends.BACKENDS ('torch', 'int8' or 'onnx')
         self.models = {
             'bart': {
                 'name': 'sshleifer/distilbart-cnn-6-6',  # More reliable model
                 'type': 'abstractive',
-                'language': 'en'
+                'language': 'en',
+                'backend': 'torch'
             },
             't5': {
                 'name': 't5-small',  # Smaller model
                 'type': 'abstractive',
-                'language': 'en'
+                'language': 'en',
+                'backend': 'torch'
             },
             'mbart': {
                 'name': 'facebook/mbart-large-50-many-to-many-mmt',
                 'type': 'abstractive',
-                'language': 'multilingual'
+                'language': 'multilingual',
+                'backend': 'torch'
             },
             'mt5': {
                 'name': 'google/mt5-small',
                 'type': 'abstractive',
-                'language': 'multilingual'
+                'language': 'multilingual',
+                'backend': 'torch'
             }
         }
         
-        # Default to DistilBART model (more reliable)
+        # Pages decoded per summary length when summarizing from a lazy page source
+        self.page_budgets = {
+            'short': 8,
+            'medium': 16,
+            'long': 32
+        }
+        
+        # Chunks per pipeline call in map-reduce
+        self.batch_size = batch_size
+        
+        # Micro-batching queues shared by concurrent callers, one per model
+        # so that one model's batch never waits on another's (see enable_batching)
+        self.inference_servers = None
+        
+        # Default to DistilBART model (more reliable); non-English text is
+        # routed to the multilingual model
         self.current_model = 'bart'
-        self.tokenizer = None
-        self.model = None
-        self.summarizer = None
+        self.multilingual_model = 'mbart'
         
-        # Load the model on first use to save memory
+        # Loaded models, kept across model switches; a model is loaded on
+        # first use to save memory (warm_up loads them ahead of traffic)
+        self.model_pool = model_pool or ModelPool(self._load_handle)
+    
+    def _route(self, language):
+        """
+        Pick the model for a document's language
+        
+        Only reads the model settings, so concurrent requests in different
+        languages never switch each other's model.
+        
+        Args:
+            language (str): Language code from _detect_language
+            
+        Returns:
+            str: Key of self.models
+        """
+        model_name = self.current_model
+        if language != 'en' and self.models[model_name]['language'] != 'multilingual':
+            model_name = self.multilingual_model
+        return model_name
     
-    def _load_model(self):
-        """Load the model if not already loaded"""
-        if self.summarizer is None:
+    def _load_handle(self, model_name):
+        """Load a model for the pool, wrapped so threads can share it"""
+        return ModelHandle(model_name, self._load_pipeline(model_name))
+    
+    def _load_pipeline(self, model_name):
+        """
+        Load a summarization pipeline from disk (the model pool's loader)
+        
+        Args:
+            model_name (str): Key of self.models
+            
+        Returns:
+            Pipeline: The loaded pipeline
+        """
+        try:
+            print(f"Loading model: {model_name}")
+            model_info = self.models[model_name]
+            
+            # Quantized and ONNX Runtime backends (see inference_backends)
+            backend = model_info.get('backend', 'torch')
+            if backend != 'torch':
+                print(f"Loading model with {backend} backend: {model_info['name']}")
+                summarizer = load_pipeline(model_info['name'], backend)
+            
+            # Try to use a smaller, faster model
+            elif model_name == 't5':
+                from transformers import T5ForConditionalGeneration, T5Tokenizer
+                print("Loading T5-small model directly")
+                model = T5ForConditionalGeneration.from_pretrained("t5-small")
+                tokenizer = T5Tokenizer.from_pretrained("t5-small")
+                summarizer = pipeline(
+                    "summarization", 
+                    model=model,
+                    tokenizer=tokenizer
+                )
+            else:
+                # Fall back to standard pipeline loading
+                print(f"Loading model using pipeline: {model_info['name']}")
+                summarizer = pipeline(
+                    "summarization", 
+                    model=model_info['name'],
+                    tokenizer=model_info['name']
+                )
+            print("Model loaded successfully")
+            return summarizer
+        except Exception as e:
+            import traceback
+            print(f"Error loading model: {str(e)}")
+            print(traceback.format_exc())
+            # Fall back to a very small model as last resort
             try:
-                print(f"Loading model: {self.current_model}")
-                model_info = self.models[self.current_model]
-                
-                # Try to use a smaller, faster model
-                if self.current_model == 't5':
-                    from transformers import T5ForConditionalGeneration, T5Tokenizer
-                    print("Loading T5-small model directly")
-                    model = T5ForConditionalGeneration.from_pretrained("t5-small")
-                    tokenizer = T5Tokenizer.from_pretrained("t5-small")
-                    self.summarizer = pipeline(
-                        "summarization", 
-                        model=model,
-                        tokenizer=tokenizer
-                    )
-                else:
-                    # Fall back to standard pipeline loading
-                    print(f"Loading model using pipeline: {model_info['name']}")
-                    self.summarizer = pipeline(
-                        "summarization", 
-                        model=model_info['name'],
-                        tokenizer=model_info['name']
-                    )
-                print("Model loaded successfully")
-            except Exception as e:
-                import traceback
-                print(f"Error loading model: {str(e)}")
-                print(traceback.format_exc())
-                # Fall back to a very small model as last resort
-                try:
-                    print("Attempting to load fallback model: sshleifer/distilbart-cnn-6-6")
-                    self.summarizer = pipeline(
-                        "summarization", 
-                        model="sshleifer/distilbart-cnn-6-6"
-                    )
-                    print("Fallback model loaded successfully")
-                except Exception as e2:
-                    print(f"Failed to load fallback model: {str(e2)}")
-                    raise e  # Re-raise the original error if fallback fails
+                print("Attempting to load fallback model: sshleifer/distilbart-cnn-6-6")
+                summarizer = pipeline(
+                    "summarization", 
+                    model="sshleifer/distilbart-cnn-6-6"
+                )
+                print("Fallback model loaded successfully")
+                return summarizer
+            except Exception as e2:
+                print(f"Failed to load fallback model: {str(e2)}")
+                raise e  # Re-raise the original error if fallback fails
     
-    def generate_summary(self, text, length='medium', target_lang=None):
+    def warm_up(self, model_names=None):
+        """
+        Load models into the pool and run each once, ahead of traffic
+        
+        Args:
+            model_names (list): Keys of self.models (defaults to the current
+                model); the last one ends up most recently used
+        """
+        def run_once(name, model):
+            print(f"Warming up model: {name}")
+            model(WARMUP_TEXT, max_length=30, min_length=5, do_sample=False)
+        
+        self.model_pool.preload(model_names or [self.current_model], warmup=run_once)
+    
+    def generate_summary(self, text, length='medium', target_lang=None, strategy='select', batch_size=None):
         """
         Generate a summary of the given text
         
@@ -86,21 +317,25 @@ class Summarizer:
             text (str): Text to summarize
             length (str): Length of summary - 'short', 'medium', or 'long'
             target_lang (str): Target language code (e.g., 'en', 'es', 'fr')
+            strategy (str): How a text longer than one model window is
+                covered, one of SUMMARY_STRATEGIES
+            batch_size (int): Chunks per pipeline call in map-reduce
+                (defaults to self.batch_size)
             
         Returns:
             dict: Summary data including text, quality metrics, and language
         """
+        if strategy not in SUMMARY_STRATEGIES:
+            raise ValueError(f"Unknown summary strategy: {strategy}")
+        
         # Detect language if not specified
         detected_lang, confidence = self._detect_language(text)
         source_lang = detected_lang
         
-        # Select appropriate model based on language
-        if detected_lang != 'en' and self.models[self.current_model]['language'] != 'multilingual':
-            # Switch to multilingual model if text is not in English
-            self.current_model = 'mbart'
-            self.summarizer = None
-            
-        self._load_model()
+        # Select appropriate model based on language; the handle is local to
+        # this call and comes from the model pool, so switching back and
+        # forth neither reloads models nor affects other requests
+        model = self.model_pool.get(self._route(detected_lang))
         
         # Calculate total word count
         total_words = len(text.split())
@@ -115,11 +350,18 @@ class Summarizer:
         # Set minimum length to ensure we get a reasonable summary
         min_length = max(50, max_length[length] // 2)
         
+        # For long documents, summarize every chunk and combine the partial
+        # summaries until they fit in one model window
+        if strategy == 'map_reduce' and self._token_counts([text], model)[0] > self._max_input_tokens(model):
+            print(f"Text is long ({len(text.split())} words), using map-reduce")
+            text = self._map_reduce(model, text, batch_size or self.batch_size)
+        
         # For long documents, use a multi-chunk approach to capture important information
-        if len(text.split()) > 1024:
+        elif len(text.split()) > WINDOW_WORDS:
             print(f"Text is long ({len(text.split())} words), using multi-chunk approach")
-            # Process the document in chunks to extract important information
-            chunks = self._chunk_text(text, max_chunk_size=800)
+            # Process the document in chunks small enough that the selected
+            # ones fit in one model input together
+            chunks = self._chunk_text(text, self._max_input_tokens(model) // SELECT_CHUNKS[length], model)
             
             # For very long documents, select chunks based on the requested summary length
             if length == 'short':
@@ -167,13 +409,14 @@ class Summarizer:
         # Generate summary
         try:
             print(f"Generating summary with length: {length}, max_length: {max_length[length]}")
-            summary = self.summarizer(
-                text,
+            summary_text = self._summarize_texts(
+                model,
+                [text],
                 max_length=max_length[length],
                 min_length=min_length,
-                do_sample=False
-            )
-            summary_text = summary[0]['summary_text']
+                do_sample=False,
+                truncation=True
+            )[0]
             print("Summary generated successfully")
             
             # Post-process the summary for better formatting
@@ -194,6 +437,164 @@ class Summarizer:
             'quality_metrics': quality_metrics
         }
         
+    def _map_reduce(self, model, text, batch_size):
+        """
+        Reduce a long text to partial summaries that fit in one model window
+        
+        Every chunk is summarized (map), then the partial summaries are
+        chunked and summarized again (reduce) until their combined length
+        fits in one model input, so every part of the text is covered.
+        
+        Args:
+            model (ModelHandle): Model to summarize with
+            text (str): Text longer than one model window
+            batch_size (int): Chunks per pipeline call
+            
+        Returns:
+            str: Partial summaries, one paragraph each, in document order,
+                truncated to fit if a level fails to shorten them
+        """
+        max_tokens = self._max_input_tokens(model)
+        chunks = self._chunk_text(text, max_tokens, model)
+        level = 0
+        while True:
+            level += 1
+            partials = self._summarize_chunks(model, chunks, batch_size)
+            combined = "\n\n".join(partials)
+            tokens = self._token_counts([combined], model)[0]
+            print(f"Map-reduce level {level}: {len(chunks)} chunks to {tokens} tokens")
+            
+            # Stop once the summaries fit
+            if tokens <= max_tokens:
+                return combined
+            
+            # A level that fails to shorten them would never converge, so keep
+            # the opening sentences of each summary, in an equal share of the
+            # window (less one token for the paragraph break)
+            if tokens >= sum(self._token_counts(chunks, model)):
+                share = max(1, max_tokens // len(partials) - 1)
+                print(f"Map-reduce level {level} did not shorten the text, truncating to {max_tokens} tokens")
+                return "\n\n".join(self._chunk_text(partial, share, model)[0] for partial in partials if partial.strip())
+            chunks = self._chunk_text(combined, max_tokens, model)
+    
+    def _summarize_chunks(self, model, chunks, batch_size):
+        """
+        Summarize chunks in batched pipeline calls
+        
+        Args:
+            model (ModelHandle): Model to summarize with
+            chunks (list): Chunk texts
+            batch_size (int): Chunks per forward pass
+            
+        Returns:
+            list: One partial summary per chunk, in order
+        """
+        partials = list(chunks)
+        
+        # Chunks already shorter than a partial summary are kept as they are
+        pending = [i for i, chunk in enumerate(chunks) if len(chunk.split()) > PARTIAL_MAX_LENGTH]
+        if not pending:
+            return partials
+        
+        cleaned = [self._clean_text_for_summarization(chunks[i]) for i in pending]
+        try:
+            results = self._summarize_texts(
+                model,
+                cleaned,
+                batch_size=batch_size,
+                max_length=PARTIAL_MAX_LENGTH,
+                min_length=PARTIAL_MIN_LENGTH,
+                do_sample=False,
+                truncation=True
+            )
+            for i, result in zip(pending, results):
+                partials[i] = result
+        except Exception as e:
+            print(f"Error during chunk summarization: {str(e)}")
+            # Keep the opening words of each chunk so the document stays covered
+            for i, chunk in zip(pending, cleaned):
+                partials[i] = " ".join(chunk.split()[:PARTIAL_MAX_LENGTH])
+        
+        return partials
+    
+    def enable_batching(self, max_batch_size=None, max_wait=None):
+        """
+        Route model calls through micro-batching InferenceServers
+        
+        Concurrent generate_summary calls then share forward passes: each
+        text is queued, and texts for the same model with the same
+        generation settings that arrive within max_wait run as one batch.
+        Every model has its own server and worker thread, so a slow batch
+        or a cold load of one model does not hold up the others.
+        
+        Args:
+            max_batch_size (int): Most texts per forward pass
+            max_wait (float): Seconds a text waits for others to batch with
+            
+        Returns:
+            dict: InferenceServer per model name, whose stats() report batch
+                sizes and queue waits
+        """
+        if self.inference_servers is None:
+            options = {}
+            if max_batch_size is not None:
+                options['max_batch_size'] = max_batch_size
+            if max_wait is not None:
+                options['max_wait'] = max_wait
+            self.inference_servers = {
+                name: InferenceServer(partial(self._run_batch, model_name=name), **options)
+                for name in self.models
+            }
+        return self.inference_servers
+    
+    def _run_batch(self, texts, model_name, **settings):
+        """Summarize texts in one pipeline call (run_batch of model_name's InferenceServer)"""
+        results = self.model_pool.get(model_name)(texts, batch_size=len(texts), **settings)
+        return [result['summary_text'] for result in results]
+    
+    def _summarize_texts(self, model, texts, batch_size=None, **settings):
+        """
+        Summarize texts, through the inference server when batching is enabled
+        
+        Args:
+            model (ModelHandle): Model to summarize with, through its own
+                server when batching is enabled
+            texts (list): Model inputs
+            batch_size (int): Texts per forward pass without the server; the
+                server batches by its own max_batch_size
+            **settings: Generation settings (max_length, min_length, ...)
+            
+        Returns:
+            list: One summary text per input
+        """
+        if self.inference_servers is not None:
+            server = self.inference_servers[model.name]
+            futures = [server.submit(text, **settings) for text in texts]
+            return [future.result() for future in futures]
+        
+        results = model(texts, batch_size=batch_size or 1, **settings)
+        return [result['summary_text'] for result in results]
+    
+    def generate_summary_from_pages(self, pages, length='medium', target_lang=None):
+        """
+        Generate a summary while decoding only the pages the summary will use
+        
+        Args:
+            pages: Page source with a page_count attribute and a
+                page_texts(indices) method, such as LazyPDF
+            length (str): Length of summary - 'short', 'medium', or 'long'
+            target_lang (str): Target language code (e.g., 'en', 'es', 'fr')
+            
+        Returns:
+            dict: Summary data as returned by generate_summary
+        """
+        # Same lead/middle/tail coverage the multi-chunk path keeps, but
+        # chosen at page level before any text is decoded
+        indices = TextUtils.select_pages(pages.page_count, self.page_budgets[length])
+        text = "\n".join(pages.page_texts(indices))
+        
+        return self.generate_summary(text, length, target_lang)
+        
     def _detect_language(self, text):
         """Detect the language of the text"""
         # Use langid for language detection
@@ -223,156 +624,153 @@ class Summarizer:
     
     def _clean_text_for_summarization(self, text):
         """Clean text for better summarization results"""
-        import re
-        
-        # First, fix specific technical document issues
-        text = re.sub(r'topology\s*\(\s*as\s*shown\s*in\s*F\s*igure', 'topology (as shown in Figure', text)
-        text = re.sub(r'data\s*and\s*decision', 'data and decision', text)
-        text = re.sub(r'In\s*decentralized\s*systems', 'In decentralized systems', text)
-        text = re.sub(r'The\s*topology', 'The topology', text)
-        text = re.sub(r'It\s*may\s*be\s*any\s*existing\s*application', 'It may be any existing application', text)
-        text = re.sub(r'Clients\s*are\s*restricted\s*using', 'Clients are restricted using', text)
-        text = re.sub(r'Public\s+Key\s+Infrastructure\s*\(\s*PKI\s*\)', 'Public Key Infrastructure (PKI)', text)
-        text = re.sub(r'technology\s*at\s*blockchain', 'technology at blockchain', text)
-        
-        # Fix words with no spaces between them
-        text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)  # Split camelCase
-        text = re.sub(r'Indecentralizedsystems', r'In decentralized systems', text)
-        text = re.sub(r'dataanddecision', r'data and decision', text)
-        text = re.sub(r'thedataanddecisions', r'the data and decisions', text)
-        text = re.sub(r'Itmaybeanyexistingapplication', r'It may be any existing application', text)
-        text = re.sub(r'Clientsarerestrictedusing', r'Clients are restricted using', text)
-        
-        # Fix common resume formatting issues
-        text = re.sub(r'([a-z])\s+([a-z])', r'\1\2', text)  # Fix split words
-        
-        # Fix education formatting
-        text = re.sub(r'B\.\s*T\s*ech', r'B.Tech', text)
-        text = re.sub(r'C\s*G\s*P\s*A\s*:', r'CGPA:', text)
-        text = re.sub(r'(\d{4})\s*-\s*(\d{4})', r'\1-\2', text)
-        
-        # Fix percentage formatting
-        text = re.sub(r'P\s*ercentage\s*:', r'Percentage:', text)
-        text = re.sub(r'(\d+(?:\.\d+)?)\s*%', r'\1%', text)  # Fix percentages
-        
-        # Fix school and college names
-        text = re.sub(r'([a-z])college([a-z])', r'\1 College \2', text)
-        text = re.sub(r'junior\s*college', r'Junior College', text)
-        text = re.sub(r'Srichaithanya', r'Sri Chaithanya', text)
-        text = re.sub(r'([A-Za-z])\s+School', r'\1 School', text)  # Fix school names
-        text = re.sub(r'Little\s+Flower', r'Little Flower', text)  # Fix specific school name
-        
-        # Fix skills section
-        text = re.sub(r'Skills\s+Programming', r'Skills\nProgramming', text)
-        text = re.sub(r'Languages\s*:', r'Languages:', text)
-        text = re.sub(r'([A-Za-z]),\s*([A-Za-z])', r'\1, \2', text)  # Fix comma-separated lists
-        
-        # Add proper spacing for sentences and sections
-        text = re.sub(r'\.([A-Z])', r'. \1', text)
-        text = re.sub(r'(\d)\s*([A-Z])', r'\1. \2', text)
-        text = re.sub(r'(\d+)\.(\d+)', r'\1.\2', text)  # Preserve decimal points
-        
-        # Format address and postal code
-        text = re.sub(r'(Bapatla,\s*Andhra\s*Pradesh)\s*-\s*(\d{6})', r'\1 - \2', text)
+        text = _CLEANUP_RULES.apply(text)
         
         # Remove excessive whitespace
         text = re.sub(r'\s+', ' ', text).strip()
         
-        # Remove very long concatenated words (likely errors)
-        text = re.sub(r'\b\w{40,}\b', '', text)
-        
-        # Fix common resume patterns
-        text = re.sub(r'([A-Za-z])\s+(\d{3})\s*-\s*(\d{3})\s*-\s*(\d{4})', r'\1 \2-\3-\4', text)  # Phone numbers
-        
-        # Add line breaks for better readability in education sections
-        text = re.sub(r'(B\.Tech|CGPA|Degree|Percentage|Skills)', r'\n\1', text)
-        
-        # Final cleanup of any remaining issues
-        text = re.sub(r'\s+-\s*\.', r'.', text)  # Remove dangling hyphens
-        text = re.sub(r'\s+\.', r'.', text)  # Fix spaces before periods
-        
-        return text
+        return _CLEANUP_FINAL_RULES.apply(text)
     
-    def _chunk_text(self, text, max_chunk_size=800):
-        """Split text into chunks, trying to preserve paragraph structure"""
-        import re
-        
-        # Try to split by paragraphs first
-        paragraphs = re.split(r'\n\s*\n|\r\n\s*\r\n', text)
+    def _chunk_text(self, text, max_tokens=None, model=None):
+        """
+        Split text into chunks that each fit in one model input
         
-        chunks = []
-        current_chunk = ""
+        Sentences are packed greedily, in order, counting tokens with the
+        loaded model's tokenizer, so each chunk comes as close to max_tokens
+        as whole sentences allow and nothing is truncated. Paragraph breaks
+        are sentence boundaries too, and a sentence too long for one input
+        is split at word boundaries. Without a loaded tokenizer, words are
+        counted instead.
         
-        for paragraph in paragraphs:
-            # If adding this paragraph would exceed max size, start a new chunk
-            if len(current_chunk.split()) + len(paragraph.split()) > max_chunk_size and current_chunk:
-                chunks.append(current_chunk.strip())
-                current_chunk = paragraph
+        Args:
+            text (str): Text to split
+            max_tokens (int): Tokens per chunk (defaults to the model's
+                maximum input length)
+            model (ModelHandle): Model whose tokenizer counts tokens
+            
+        Returns:
+            list: Chunk texts in order
+        """
+        if max_tokens is None:
+            max_tokens = self._max_input_tokens(model)
+        
+        sentences = [
+            " ".join(sentence.split())
+            for paragraph in re.split(r'\n\s*\n', text)
+            for sentence in SENTENCE_BOUNDARY.split(paragraph)
+            if sentence.strip()
+        ]
+        
+        # A sentence costs its own tokens plus one, since joining it to the
+        # previous one with a space can change how its first word tokenizes
+        pieces = []
+        costs = []
+        for sentence, count in zip(sentences, self._token_counts(sentences, model)):
+            if count + 1 <= max_tokens:
+                pieces.append(sentence)
+                costs.append(count + 1)
             else:
-                if current_chunk:
-                    current_chunk += " " + paragraph
-                else:
-                    current_chunk = paragraph
+                for part, part_count in self._split_sentence(sentence, max_tokens, model):
+                    pieces.append(part)
+                    costs.append(part_count + 1)
         
-        # Add the last chunk if it's not empty
-        if current_chunk:
-            chunks.append(current_chunk.strip())
+        chunks = []
+        current = []
+        current_tokens = 0
+        for piece, cost in zip(pieces, costs):
+            # If adding this sentence would exceed the budget, start a new chunk
+            if current and current_tokens + cost > max_tokens:
+                chunks.append(" ".join(current))
+                current = []
+                current_tokens = 0
+            current.append(piece)
+            current_tokens += cost
         
-        # If we have no chunks (e.g., no paragraph breaks), fall back to word-based chunking
-        if not chunks:
-            words = text.split()
-            for i in range(0, len(words), max_chunk_size):
-                chunks.append(" ".join(words[i:i + max_chunk_size]))
+        # Add the last chunk if it's not empty
+        if current:
+            chunks.append(" ".join(current))
         
         return chunks
     
+    def _split_sentence(self, sentence, max_tokens, model=None):
+        """
+        Split a sentence too long for one model input into halves until
+        every part fits (with the one-token joining allowance)
+        
+        Halves are cut at word boundaries, or mid-word for a single word
+        too long to fit (usually extraction debris).
+        
+        Returns:
+            list: (part, token count) tuples in order
+        """
+        words = sentence.split()
+        if len(words) > 1:
+            middle = len(words) // 2
+            halves = [" ".join(words[:middle]), " ".join(words[middle:])]
+        else:
+            middle = len(sentence) // 2
+            halves = [sentence[:middle], sentence[middle:]]
+        
+        parts = []
+        for half, count in zip(halves, self._token_counts(halves, model)):
+            if count + 1 <= max_tokens or len(half) <= 1:
+                parts.append((half, count))
+            else:
+                parts.extend(self._split_sentence(half, max_tokens, model))
+        return parts
+    
+    def _token_counts(self, texts, model=None):
+        """
+        Tokens of model's tokenizer in each text (without special tokens), or
+        words when there is no tokenizer
+        """
+        if model is None or model.tokenizer is None or not texts:
+            return [len(text.split()) for text in texts]
+        return [len(ids) for ids in model.tokenize(list(texts), add_special_tokens=False)['input_ids']]
+    
+    def _max_input_tokens(self, model=None):
+        """
+        Tokens of text that fit in one input of model, after its special
+        tokens (CHUNK_WORDS words when there is no tokenizer)
+        """
+        tokenizer = model.tokenizer if model is not None else None
+        if tokenizer is None:
+            return CHUNK_WORDS
+        
+        limit = tokenizer.model_max_length
+        if limit >= _UNLIMITED_TOKENS:
+            config = getattr(getattr(model.model, 'model', None), 'config', None)
+            limit = getattr(config, 'max_position_embeddings', None) or DEFAULT_MAX_INPUT_TOKENS
+        return limit - tokenizer.num_special_tokens_to_add()
+    
     def _post_process_summary(self, summary_text):
         """Apply final formatting to the generated summary"""
-        import re
-        
-        # Fix specific technical document issues
-        summary_text = re.sub(r'dataanddecision', r'data and decision', summary_text)
-        summary_text = re.sub(r'Indecentralizedsystems', r'In decentralized systems', summary_text)
-        summary_text = re.sub(r'thedataanddecisions', r'the data and decisions', summary_text)
-        summary_text = re.sub(r'Itmaybeanyexistingapplication', r'It may be any existing application', summary_text)
-        summary_text = re.sub(r'Clientsarerestrictedusing', r'Clients are restricted using', summary_text)
-        summary_text = re.sub(r'atblockchain', r'at blockchain', summary_text)
-        summary_text = re.sub(r'Thetopology', r'The topology', summary_text)
-        
-        # Fix common formatting issues
-        summary_text = re.sub(r'(\d+(?:\.\d+)?)\s*%', r'\1%', summary_text)
-        summary_text = re.sub(r'P\s+ercentage', r'Percentage', summary_text)
-        summary_text = re.sub(r'Little\s+Flower', r'Little Flower', summary_text)
-        summary_text = re.sub(r'Skills\s+Programming', r'Skills: Programming', summary_text)
-        summary_text = re.sub(r'(Bapatla,\s*Andhra\s*Pradesh)\s*-\s*(\d{6})', r'\1 - \2', summary_text)
-        
-        # Fix technical document formatting
-        summary_text = re.sub(r'F\s+igure', r'Figure', summary_text)
-        summary_text = re.sub(r'as\s+shown\s+in', r'as shown in', summary_text)
-        summary_text = re.sub(r'Public\s+Key\s+Infrastructure', r'Public Key Infrastructure', summary_text)
-        summary_text = re.sub(r'PKI\s+technology', r'PKI technology', summary_text)
-        summary_text = re.sub(r'blockchain\s+technology', r'blockchain technology', summary_text)
-        summary_text = re.sub(r'data\s+and\s+decision', r'data and decision', summary_text)
-        summary_text = re.sub(r'decentralized\s+systems', r'decentralized systems', summary_text)
-        summary_text = re.sub(r'topology\s+\(asshownin', r'topology (as shown in', summary_text)
-        
-        # Fix spacing and punctuation
-        summary_text = re.sub(r'([A-Za-z]),([A-Za-z])', r'\1, \2', summary_text)
-        summary_text = re.sub(r'\s+-\s*\.', r'.', summary_text)  # Remove "- ."
-        summary_text = re.sub(r'\s+\.', r'.', summary_text)  # Fix spaces before periods
-        
-        # Add line breaks for better readability
-        sections = ['Education:', 'Skills:', 'Experience:', 'Projects:', 'Percentage:', 'CGPA:']
-        for section in sections:
-            summary_text = re.sub(f'([.!?])\s*({section})', r'\1\n\n\2', summary_text)
-        
-        return summary_text
+        return _SUMMARY_RULES.apply(summary_text)
+    
+    def set_backend(self, model_name, backend):
+        """
+        Change the inference backend of one model
+        
+        Args:
+            model_name (str): Key of self.models
+            backend (str): One of BACKENDS
+            
+        Returns:
+            bool: Whether the backend was changed
+        """
+        if model_name not in self.models or backend not in BACKENDS:
+            return False
+        
+        self.models[model_name]['backend'] = backend
+        # Drop the model loaded with the old backend; calls already holding
+        # it finish on it
+        self.model_pool.evict(model_name)
+        return True
     
     def set_model(self, model_name):
         """Change the summarization model"""
         if model_name in self.models:
+            # Later calls route to the new model; calls in flight keep theirs
             self.current_model = model_name
-            # Reset loaded model
-            self.summarizer = None
             return True
         return False
\ No newline at end of file
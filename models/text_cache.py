@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import threading
+import zlib
+from collections import OrderedDict
+
+class TextCache:
+    """Content-addressed on-disk cache of cleaned PDF text with LRU eviction"""
+
+    def __init__(self, cache_dir, max_bytes=256 * 1024 * 1024):
+        """
+        Args:
+            cache_dir (str): Directory holding the cache entries
+            max_bytes (int): Size cap for all compressed entries together
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        # Entry sizes by file name, least recently used first, and their sum;
+        # the directory is only listed here, not on every put
+        self._sizes = OrderedDict()
+        self._total = 0
+        self._load_sizes()
+
+    def _load_sizes(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json.z'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        for _, size, name in sorted(entries):
+            self._sizes[name] = size
+            self._total += size
+
+    @staticmethod
+    def digest(data):
+        """SHA-256 hex digest of a bytes-like object"""
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def digest_stream(file, chunk_size=1024 * 1024):
+        """SHA-256 hex digest of a binary file object, read from its current position"""
+        sha = hashlib.sha256()
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            sha.update(chunk)
+        return sha.hexdigest()
+
+    @staticmethod
+    def digest_file(path):
+        """SHA-256 hex digest of a file's contents"""
+        with open(path, 'rb') as file:
+            return TextCache.digest_stream(file)
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key + '.json.z')
+
+    def get(self, key):
+        """
+        Look up a cache entry
+
+        Args:
+            key (str): Digest of the uploaded bytes
+
+        Returns:
+            dict: The stored entry, or None on a miss
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, 'rb') as file:
+                entry = json.loads(zlib.decompress(file.read()).decode('utf-8'))
+            # Touch the entry so eviction after a restart sees it as recently used
+            os.utime(path)
+        except (OSError, ValueError, zlib.error):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+            name = os.path.basename(path)
+            if name in self._sizes:
+                self._sizes.move_to_end(name)
+        return entry
+
+    def put(self, key, entry):
+        """
+        Store a cache entry and evict old ones if over the size cap
+
+        Args:
+            key (str): Digest of the uploaded bytes
+            entry (dict): JSON-serializable entry, e.g. {'text': ...}
+        """
+        payload = zlib.compress(json.dumps(entry).encode('utf-8'))
+        path = self._entry_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as file:
+                file.write(payload)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Failed to write cache entry: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        self._evict(os.path.basename(path), len(payload))
+
+    def _evict(self, name, size):
+        """Record a stored entry, then remove least recently used entries until the cache fits its cap"""
+        with self._lock:
+            self._total += size - self._sizes.pop(name, 0)
+            self._sizes[name] = size
+
+            while self._total > self.max_bytes and self._sizes:
+                oldest, oldest_size = self._sizes.popitem(last=False)
+                self._total -= oldest_size
+                try:
+                    os.remove(os.path.join(self.cache_dir, oldest))
+                except OSError:
+                    continue
+                self.evictions += 1
+
+    def stats(self):
+        """Hit, miss and eviction counters for this process"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'max_bytes': self.max_bytes
+            }
@@ -1,4 +1,8 @@
 import re
+from models.word_boundaries import BoundaryInserter, COMMON_WORDS
+
+# Splits dictionary words that PDF extraction ran together
+_WORD_BOUNDARIES = BoundaryInserter(COMMON_WORDS)
 
 class TextProcessor:
     """A simple text processor to fix spacing and formatting issues"""
@@ -12,25 +16,8 @@ class TextProcessor:
         # First, add spaces between words that are concatenated
         # This handles cases like "dataanddecision" -> "data and decision"
         
-        # Common word boundaries to check
-        common_words = [
-            "blockchain", "technology", "data", "decision", "systems", 
-            "public", "key", "infrastructure", "network", "transaction",
-            "consensus", "node", "client", "application", "process",
-            "database", "ledger", "block", "hash", "security",
-            "distributed", "decentralized", "centralized", "figure",
-            "shown", "topology", "platform", "hyperledger", "ethereum",
-            "bitcoin", "smart", "contract", "proof", "work", "stake",
-            "private", "consortium", "permissioned", "permissionless"
-        ]
-        
         # Add spaces between common words
-        processed_text = text
-        for i, word1 in enumerate(common_words):
-            for word2 in common_words:
-                if word1 != word2:
-                    pattern = f"({word1})({word2})"
-                    processed_text = re.sub(pattern, r"\1 \2", processed_text, flags=re.IGNORECASE)
+        processed_text = _WORD_BOUNDARIES.apply(text)
         
         # Add spaces between lowercase and uppercase letters (camelCase)
         processed_text = re.sub(r'([a-z])([A-Z])', r'\1 \2', processed_text)
@@ -45,8 +32,8 @@ class TextProcessor:
         processed_text = re.sub(r'([.!?])([A-Z])', r'\1 \2', processed_text)
         
         # Fix spacing and punctuation
-        processed_text = re.sub(r'\s+-\s*\.', r'.', processed_text)  # Remove "- ."
-        processed_text = re.sub(r'\s+\.', r'.', processed_text)  # Fix spaces before periods
+        processed_text = re.sub(r'(?<!\s)\s+-\s*\.', r'.', processed_text)  # Remove "- ."
+        processed_text = re.sub(r'(?<!\s)\s+\.', r'.', processed_text)  # Fix spaces before periods
         
         # Remove excessive whitespace
         processed_text = re.sub(r'\s{2,}', ' ', processed_text)
@@ -1,96 +1,216 @@
 import re
 from collections import Counter
+from itertools import chain
+import numpy as np
 import requests
+from models.rewrite_rules import RuleSet
+from models.word_segmenter import default_segmenter
+from models.document import Document
+from models.sharded_cleanup import ShardedCleaner, collapse_run
+from models.cleanliness import CleanlinessDetector, PROFILES, SAMPLE_CHARS
+
+# Version of the cleanup output. Bump it whenever a change to the cleaners
+# changes what they produce, so text cached by older code is not served.
+CLEANER_VERSION = 1
+
+# Rewrite rules applied in order by TextUtils.fix_spacing
+_SPACING_RULES = RuleSet([
+    # Add spaces between lowercase and uppercase letters (camelCase)
+    (r'([a-z])([A-Z])', r'\1 \2'),
+
+    # Fix common concatenated words
+    (r'(?<![a-z])([a-z]{2,})([A-Z][a-z]{2,})', r'\1 \2'),
+
+    # Add spaces after punctuation
+    (r'\.([A-Za-z])', r'. \1'),  # Period
+    (r',([A-Za-z])', r', \1'),   # Comma
+    (r';([A-Za-z])', r'; \1'),   # Semicolon
+    (r':([A-Za-z])', r': \1'),   # Colon
+
+    # Fix spacing between sentences
+    (r'([.!?])([A-Z])', r'\1 \2'),
+
+    # Fix common word patterns
+    (r'dataanddecision', r'data and decision', re.IGNORECASE),
+    (r'Indecentralizedsystems', r'In decentralized systems', re.IGNORECASE),
+    (r'thedataanddecisions', r'the data and decisions', re.IGNORECASE),
+    (r'Itmaybeanyexisting', r'It may be any existing', re.IGNORECASE),
+    (r'Clientsarerestrictedusing', r'Clients are restricted using', re.IGNORECASE),
+    (r'atblockchain', r'at blockchain', re.IGNORECASE),
+    (r'Thetopology', r'The topology', re.IGNORECASE),
+    (r'blockchaintechnology', r'blockchain technology', re.IGNORECASE),
+    (r'machinelearning', r'machine learning', re.IGNORECASE),
+    (r'artificialintelligence', r'artificial intelligence', re.IGNORECASE),
+    (r'computervision', r'computer vision', re.IGNORECASE),
+    (r'naturallanguage', r'natural language', re.IGNORECASE),
+    (r'deeplearning', r'deep learning', re.IGNORECASE),
+    (r'neuralnetwork', r'neural network', re.IGNORECASE),
+    (r'datascienc', r'data scienc', re.IGNORECASE),
+
+    # Remove excessive whitespace
+    (r'\s{2,}', ' '),
+], name='text_utils')
+
+# Whitespace collapsed by every cleanup profile, as by the last spacing rule
+_WHITESPACE_RUN = re.compile(r'\s{2,}')
+
+# Leading characters of a streamed document its cleanup profile is chosen from
+STREAM_PROFILE_CHARS = 4 * SAMPLE_CHARS
+
+# Sentence selection strategies of TextUtils.summarize_text
+SUMMARY_MODES = ('position', 'scored')
+
+# Common words left out of keywords and of sentence salience
+_STOP_WORDS = {
+    'the', 'and', 'a', 'an', 'in', 'on', 'at', 'to', 'for', 'with', 'by',
+    'of', 'that', 'this', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
+    'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'shall', 'should',
+    'can', 'could', 'may', 'might', 'must', 'from', 'as', 'if', 'then', 'than'
+}
+
+# Words scored by the 'scored' summary mode (short words carry little content)
+_CONTENT_WORD = re.compile(r'[a-z]{4,}')
+
+# Weight of the position prior against term-frequency salience (both 0-1)
+POSITION_WEIGHT = 0.2
 
 class TextUtils:
     """Unified text utilities for processing, formatting, and summarizing text"""
     
     @staticmethod
-    def fix_spacing(text):
-        """Fix spacing issues in text"""
+    def fix_spacing(text, workers=None):
+        """
+        Fix spacing issues in text
+        
+        Args:
+            text (str): Text to fix
+            workers (int): Number of processes to shard long texts across;
+                None or 1 fixes the text in-process
+            
+        Returns:
+            str: Text with spacing fixed
+        """
         if not text:
             return ""
+        
+        if workers and workers > 1:
+            return _SPACING_CLEANER.apply(text, workers)
             
-        # Add spaces between lowercase and uppercase letters (camelCase)
-        text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)
-        
-        # Fix common concatenated words
-        text = re.sub(r'([a-z]{2,})([A-Z][a-z]{2,})', r'\1 \2', text)
-        
-        # Add spaces after punctuation
-        text = re.sub(r'\.([A-Za-z])', r'. \1', text)  # Period
-        text = re.sub(r',([A-Za-z])', r', \1', text)   # Comma
-        text = re.sub(r';([A-Za-z])', r'; \1', text)   # Semicolon
-        text = re.sub(r':([A-Za-z])', r': \1', text)   # Colon
-        
-        # Fix spacing between sentences
-        text = re.sub(r'([.!?])([A-Z])', r'\1 \2', text)
-        
-        # Fix common word patterns
-        common_patterns = [
-            (r'dataanddecision', r'data and decision'),
-            (r'Indecentralizedsystems', r'In decentralized systems'),
-            (r'thedataanddecisions', r'the data and decisions'),
-            (r'Itmaybeanyexisting', r'It may be any existing'),
-            (r'Clientsarerestrictedusing', r'Clients are restricted using'),
-            (r'atblockchain', r'at blockchain'),
-            (r'Thetopology', r'The topology'),
-            (r'blockchaintechnology', r'blockchain technology'),
-            (r'machinelearning', r'machine learning'),
-            (r'artificialintelligence', r'artificial intelligence'),
-            (r'computervision', r'computer vision'),
-            (r'naturallanguage', r'natural language'),
-            (r'deeplearning', r'deep learning'),
-            (r'neuralnetwork', r'neural network'),
-            (r'datascienc', r'data scienc')
-        ]
-        
-        for pattern, replacement in common_patterns:
-            text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
-        
-        # Remove excessive whitespace
-        text = re.sub(r'\s{2,}', ' ', text)
+        text = _SPACING_RULES.apply(text)
+        
+        # Split the words that were run together and that the literal patterns
+        # above do not cover
+        text = default_segmenter().split_glued(text)
         
         return text.strip()
     
     @staticmethod
-    def extract_keywords(text, num_keywords=20):
-        """Extract keywords from text"""
-        # Clean the text
-        text = TextUtils.fix_spacing(text)
-        
-        # Common words to exclude
-        stop_words = {
-            'the', 'and', 'a', 'an', 'in', 'on', 'at', 'to', 'for', 'with', 'by',
-            'of', 'that', 'this', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
-            'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'shall', 'should',
-            'can', 'could', 'may', 'might', 'must', 'from', 'as', 'if', 'then', 'than'
-        }
+    def clean_extracted_text(text, workers=None, profile='auto'):
+        """
+        Clean extracted text with the cheapest profile that repairs it
         
-        # Split into words
-        words = text.lower().split()
+        Args:
+            text (str): Text as extracted from the PDF
+            workers (int): Number of processes for the full profile (optional)
+            profile (str): 'full', 'light', 'none', or 'auto' to choose one
+                from a sample of the text
+            
+        Returns:
+            tuple: (cleaned text, profile used)
+        """
+        if profile == 'auto':
+            profile = CleanlinessDetector.choose_profile(text)
+        elif profile not in PROFILES:
+            raise ValueError(f"Unknown cleanup profile: {profile}")
         
-        # Filter out stop words and short words
-        filtered_words = [word for word in words if word not in stop_words and len(word) > 3]
+        if profile == 'full':
+            return TextUtils.fix_spacing(text, workers), profile
+        if profile == 'light':
+            return _light_cleanup(text), profile
+        return _whitespace_cleanup(text), profile
+    
+    @staticmethod
+    def iter_clean(pieces, profile='auto'):
+        """
+        Clean extracted text that arrives in pieces (pages, say), one shard at a time
+        
+        Only about one shard of the text is held at once. With 'auto', the
+        profile is chosen from the first STREAM_PROFILE_CHARS of the text,
+        so a long document may get another profile than
+        clean_extracted_text would choose from samples of all of it.
+        
+        Args:
+            pieces (iterable): Consecutive pieces of the extracted text
+            profile (str): 'full', 'light', 'none', or 'auto'
+            
+        Yields:
+            str: Cleaned text, cut at whitespace
+        """
+        pieces = iter(pieces)
+        if profile == 'auto':
+            head = []
+            head_chars = 0
+            for piece in pieces:
+                head.append(piece)
+                head_chars += len(piece)
+                if head_chars >= STREAM_PROFILE_CHARS:
+                    break
+            profile = CleanlinessDetector.choose_profile("".join(head))
+            pieces = chain(head, pieces)
+        elif profile not in PROFILES:
+            raise ValueError(f"Unknown cleanup profile: {profile}")
+        
+        yield from _PROFILE_CLEANERS[profile].iter_apply(pieces)
+    
+    @staticmethod
+    def as_document(text):
+        """
+        Wrap text in a Document whose normalized text is fix_spacing(text)
+        
+        Args:
+            text: Raw text, or a Document that is returned unchanged
+            
+        Returns:
+            Document: Document sharing its analysis between pipeline stages
+        """
+        if isinstance(text, Document):
+            return text
+        return Document(text, normalize=TextUtils.fix_spacing)
+    
+    @staticmethod
+    def extract_keywords(text, num_keywords=20):
+        """
+        Extract keywords from text (a string, a Document, or cleaned pieces
+        cut at whitespace, such as iter_clean yields, counted as they arrive)
+        """
+        if isinstance(text, (str, Document)):
+            counts = TextUtils.as_document(text).word_counts
+        else:
+            counts = Counter()
+            for piece in text:
+                counts.update(piece.lower().split())
         
-        # Count word frequencies
-        word_counts = Counter(filtered_words)
+        # Count word frequencies, leaving out stop words and short words
+        word_counts = Counter({
+            word: count for word, count in counts.items()
+            if word not in _STOP_WORDS and len(word) > 3
+        })
+        total = sum(word_counts.values())
         
         # Get the most common words
         keywords = []
         for word, count in word_counts.most_common(num_keywords):
             keywords.append({
                 "term": word,
-                "score": count / len(filtered_words)
+                "score": count / total
             })
         
         return keywords
     
     @staticmethod
     def extract_topics(text, num_topics=3, num_words=10):
-        """Extract topics from text"""
-        # Clean the text
-        text = TextUtils.fix_spacing(text)
+        """Extract topics from text (a string or a Document)"""
+        lower_text = TextUtils.as_document(text).lower_text
         
         # Define topic categories and their associated terms
         topic_categories = {
@@ -122,7 +242,7 @@ class TextUtils:
         for category, terms in topic_categories.items():
             score = 0
             for term in terms:
-                score += text.lower().count(term)
+                score += lower_text.count(term)
             topic_scores[category] = score
         
         # Sort topics by score
@@ -135,7 +255,7 @@ class TextUtils:
                 # Find terms from this category that appear in the text
                 terms = []
                 for term in topic_categories[category]:
-                    if term in text.lower() and len(terms) < num_words:
+                    if term in lower_text and len(terms) < num_words:
                         terms.append(term)
                 
                 # Only add topics with terms
@@ -148,26 +268,59 @@ class TextUtils:
         return topics
     
     @staticmethod
-    def summarize_text(text, ratio=0.5):
-        """Generate a summary by extracting key sentences"""
-        # Clean the text
-        text = TextUtils.fix_spacing(text)
+    def summarize_text(text, ratio=0.5, mode='position'):
+        """
+        Generate a summary by extracting key sentences (text may be a Document)
+        
+        Args:
+            text (str): Text to summarize, or a Document
+            ratio (float): Proportion of sentences to keep
+            mode (str): 'position' takes the first and last sentences and an
+                even spread in between; 'scored' takes the sentences with the
+                highest sentence_scores()
+            
+        Returns:
+            str: Selected sentences in their original order
+        """
+        if mode not in SUMMARY_MODES:
+            raise ValueError(f"Unknown summary mode: {mode}")
         
-        # Split into sentences
-        sentences = re.split(r'(?<=[.!?])\s+(?=[A-Z])', text)
+        document = TextUtils.as_document(text)
+        sentences = document.sentences
         
         # Handle very short texts
         if len(sentences) <= 3:
-            return text
+            return document.text
         
         # Calculate number of sentences to include
         num_sentences = max(1, int(len(sentences) * ratio))
         
-        # For simplicity, take sentences from beginning, middle, and end
-        selected_sentences = []
+        if mode == 'scored':
+            indices = TextUtils.top_sentences(TextUtils.sentence_scores(document), num_sentences)
+        else:
+            indices = TextUtils.position_sentences(len(sentences), num_sentences)
+        
+        # Join the selected sentences
+        summary = ' '.join(sentences[i] for i in indices)
+        
+        # Ensure the summary ends with proper punctuation
+        if summary and not summary.rstrip().endswith(('.', '!', '?')):
+            summary = summary.rstrip() + "."
+        
+        return summary
+    
+    @staticmethod
+    def position_sentences(sentence_count, num_sentences):
+        """
+        Pick sentences by position: the first, the last and an even spread
+        in between
         
+        Returns:
+            list: Sorted sentence indices
+        """
         # Always include the first sentence
-        selected_sentences.append(sentences[0])
+        selected = [0]
+        last = sentence_count - 1
         
         # If we need more sentences, add from middle and end
         if num_sentences > 1:
@@ -175,39 +328,132 @@ class TextUtils:
             
             if remaining == 1:
                 # Just take the last sentence
-                selected_sentences.append(sentences[-1])
+                selected.append(last)
             elif remaining == 2:
                 # Take one from middle and one from end
-                middle_idx = len(sentences) // 2
-                selected_sentences.append(sentences[middle_idx])
-                selected_sentences.append(sentences[-1])
+                selected.append(sentence_count // 2)
+                selected.append(last)
             else:
                 # Distribute remaining sentences evenly
-                step = len(sentences) // remaining
+                step = sentence_count // remaining
                 for i in range(1, remaining):
                     idx = i * step
-                    if idx < len(sentences) and idx not in [0, len(sentences)-1]:
-                        selected_sentences.append(sentences[idx])
+                    if idx < sentence_count and idx not in (0, last):
+                        selected.append(idx)
                 
                 # Always include the last sentence
-                if sentences[-1] not in selected_sentences:
-                    selected_sentences.append(sentences[-1])
+                selected.append(last)
         
         # Ensure we don't exceed the requested ratio
-        selected_sentences = selected_sentences[:num_sentences]
+        return sorted(selected[:num_sentences])
+    
+    @staticmethod
+    def sentence_scores(document):
+        """
+        Score every sentence by term-frequency salience plus a position prior
         
-        # Sort sentences by their original order
-        sentence_indices = [(sentences.index(s), s) for s in selected_sentences]
-        sentence_indices.sort()
+        A sentence's salience is the summed document frequency of its content
+        words (stop words and words under 4 letters left out), divided by the
+        square root of its length so long sentences do not win on length
+        alone. The prior favours the opening and closing sentences.
         
-        # Join the selected sentences
-        summary = ' '.join([s[1] for s in sentence_indices])
+        Args:
+            document (Document): Document to score
+            
+        Returns:
+            ndarray: One score per sentence in document.sentences
+        """
+        sentences = document.sentences
         
-        # Ensure the summary ends with proper punctuation
-        if summary and not summary.rstrip().endswith(('.', '!', '?')):
-            summary = summary.rstrip() + "."
+        # Flatten every sentence's content words into one array of word ids
+        vocabulary = {}
+        word_ids = []
+        lengths = np.empty(len(sentences))
+        content_counts = np.empty(len(sentences), dtype=np.int64)
+        for index, sentence in enumerate(sentences):
+            lower_sentence = sentence.lower()
+            words = [word for word in _CONTENT_WORD.findall(lower_sentence) if word not in _STOP_WORDS]
+            word_ids.extend(vocabulary.setdefault(word, len(vocabulary)) for word in words)
+            content_counts[index] = len(words)
+            lengths[index] = len(lower_sentence.split())
+        word_ids = np.asarray(word_ids, dtype=np.int64)
+        sentence_ids = np.repeat(np.arange(len(sentences)), content_counts)
         
-        return summary
+        # Salience from the frequency of each word across the document
+        salience = np.zeros(len(sentences))
+        if len(word_ids):
+            frequencies = np.bincount(word_ids).astype(np.float64)
+            salience = np.bincount(sentence_ids, weights=frequencies[word_ids], minlength=len(sentences))
+            salience /= np.sqrt(np.maximum(lengths, 1))
+            salience /= max(salience.max(), 1e-12)
+        
+        # Prior of 1 at either end of the document and 0 in the middle
+        relative_position = np.linspace(0.0, 1.0, len(sentences))
+        prior = (2 * relative_position - 1) ** 2
+        
+        return salience + POSITION_WEIGHT * prior
+    
+    @staticmethod
+    def top_sentences(scores, num_sentences):
+        """
+        Indices of the num_sentences highest scores, in document order
+        
+        Uses a partial sort, so the cost is linear in the number of sentences
+        plus a sort of the selected ones.
+        
+        Returns:
+            ndarray: Sorted sentence indices
+        """
+        if num_sentences >= len(scores):
+            return np.arange(len(scores))
+        
+        return np.sort(np.argpartition(-scores, num_sentences - 1)[:num_sentences])
+    
+    @staticmethod
+    def select_pages(page_count, max_pages):
+        """
+        Choose which pages to read when only max_pages can be decoded
+
+        Mirrors the lead/middle/tail selection of the summarizers: a third of
+        the budget goes to the opening pages, a third to the closing pages and
+        the rest is spread evenly over the middle of the document.
+
+        Returns:
+            list: Sorted 0-based page indices
+        """
+        if page_count <= max_pages:
+            return list(range(page_count))
+        
+        lead = max(1, max_pages // 3)
+        tail = max(1, max_pages // 3)
+        middle = max_pages - lead - tail
+        
+        selected = set(range(lead)) | set(range(page_count - tail, page_count))
+        interior = page_count - lead - tail
+        for i in range(middle):
+            selected.add(lead + (2 * i + 1) * interior // (2 * middle))
+        
+        return sorted(selected)
+    
+    @staticmethod
+    def summarize_pages(pages, ratio=0.5, max_pages=24, mode='position'):
+        """
+        Summarize a document while decoding at most max_pages of it
+
+        Args:
+            pages: Page source with a page_count attribute and a
+                page_texts(indices) method, such as LazyPDF
+            ratio (float): Proportion of sentences to keep
+            max_pages (int): Page budget
+            mode (str): Sentence selection, one of SUMMARY_MODES
+            
+        Returns:
+            tuple: (summary, Document of the pages that were read)
+        """
+        indices = TextUtils.select_pages(pages.page_count, max_pages)
+        document = TextUtils.as_document("".join(page_text + "\n" for page_text in pages.page_texts(indices)))
+        
+        return TextUtils.summarize_text(document, ratio, mode), document
     
     @staticmethod
     def translate_text(text, target_lang='en'):
@@ -237,4 +483,27 @@ class TextUtils:
             
         except Exception as e:
             print(f"Translation failed: {str(e)}")
-            return text
\ No newline at end of file
+            return text
+
+
+def _light_cleanup(text):
+    """The 'light' profile: spacing rules only, without splitting glued words"""
+    return _SPACING_RULES.apply(text).strip()
+
+
+def _whitespace_cleanup(text):
+    """The 'none' profile: even clean text has its whitespace runs collapsed"""
+    return _WHITESPACE_RUN.sub(lambda match: collapse_run(match.group(0)), text).strip()
+
+
+# No spacing rule matches across a whitespace run (the last one only
+# collapses whole runs), so fix_spacing can be sharded at any of them
+_SPACING_CLEANER = ShardedCleaner(TextUtils.fix_spacing)
+
+# Cleaner of each cleanup profile; like the full profile, the others never
+# match across a whitespace run
+_PROFILE_CLEANERS = {
+    'full': _SPACING_CLEANER,
+    'light': ShardedCleaner(_light_cleanup),
+    'none': ShardedCleaner(_whitespace_cleanup)
+}
@@ -0,0 +1,132 @@
+import re
+from bisect import bisect_right
+
+# Dictionary words that PDF extraction often runs together
+COMMON_WORDS = (
+    "blockchain", "technology", "data", "decision", "systems",
+    "public", "key", "infrastructure", "network", "transaction",
+    "consensus", "node", "client", "application", "process",
+    "database", "ledger", "block", "hash", "security",
+    "distributed", "decentralized", "centralized", "figure",
+    "shown", "topology", "platform", "hyperledger", "ethereum",
+    "bitcoin", "smart", "contract", "proof", "work", "stake",
+    "private", "consortium", "permissioned", "permissionless"
+)
+
+# Characters a case-insensitive ASCII word can match: ASCII letters plus the
+# non-ASCII letters that re.IGNORECASE folds onto them
+_LETTER_RUN = re.compile('[a-z\u0130\u0131\u017f\u212a]+', re.IGNORECASE)
+
+# Map those non-ASCII letters to the ASCII letter they match
+_ASCII_FOLD = str.maketrans({'\u0130': 'i', '\u0131': 'i', '\u017f': 's', '\u212a': 'k'})
+
+
+class BoundaryInserter:
+    """
+    Insert a space wherever one dictionary word runs straight into another
+
+    Equivalent to running re.sub(f"({w1})({w2})", r"\\1 \\2", text,
+    flags=re.IGNORECASE) for every ordered pair of distinct words, but each
+    letter run is scanned once against a trie of the words, so the cost
+    grows with the text rather than with the square of the vocabulary.
+    """
+
+    def __init__(self, words):
+        """
+        Args:
+            words (iterable): Lowercase ASCII words; their order is the order
+                in which overlapping pairs take precedence
+        """
+        self.words = list(words)
+        self.rank = {word: index for index, word in enumerate(self.words)}
+
+        self.trie = {}
+        for word in self.words:
+            node = self.trie
+            for char in word:
+                node = node.setdefault(char, {})
+            node[''] = word
+
+        # Runs shorter than the shortest possible pair cannot need a space
+        lengths = sorted(len(word) for word in self.words)
+        self.min_run = lengths[0] + lengths[1] if len(lengths) > 1 else float('inf')
+
+    def _occurrences(self, run):
+        """Map each position in run to the words starting and ending there"""
+        starts = {}
+        ends = {}
+        for i in range(len(run)):
+            node = self.trie
+            for j in range(i, len(run)):
+                node = node.get(run[j])
+                if node is None:
+                    break
+                word = node.get('')
+                if word is not None:
+                    starts.setdefault(i, []).append(word)
+                    ends.setdefault(j + 1, []).append(word)
+        return starts, ends
+
+    def _split_run(self, run):
+        """Return the sorted boundary positions where a space goes in one letter run"""
+        starts, ends = self._occurrences(run.translate(_ASCII_FOLD).lower())
+
+        # Every adjacent pair of distinct words, keyed by its place in the
+        # pairwise loop order
+        pairs = {}
+        for position, left_words in ends.items():
+            for left in left_words:
+                for right in starts.get(position, ()):
+                    if left != right:
+                        key = (self.rank[left], self.rank[right])
+                        pairs.setdefault(key, []).append((position - len(left), position, position + len(right)))
+
+        # Replay the pairs in loop order: a pair only matches where no space
+        # has been inserted inside it, and re.sub never lets matches of one
+        # pair overlap. The spaces are kept sorted, so that check is a
+        # binary search
+        spaces = []
+        for key in sorted(pairs):
+            added = []
+            last_end = 0
+            for start, position, end in sorted(pairs[key]):
+                if start < last_end:
+                    continue
+                index = bisect_right(spaces, start)
+                if index < len(spaces) and spaces[index] < end:
+                    continue
+                added.append(position)
+                last_end = end
+            if added:
+                # Both lists are sorted, so this is a linear merge
+                spaces = sorted(spaces + added)
+        return spaces
+
+    def apply(self, text):
+        """Insert spaces between run-together words in text"""
+        pieces = []
+        last = 0
+        for match in _LETTER_RUN.finditer(text):
+            run = match.group(0)
+            if len(run) < self.min_run:
+                continue
+            spaces = self._split_run(run)
+            if not spaces:
+                continue
+            offset = match.start()
+            for position in spaces:
+                pieces.append(text[last:offset + position])
+                pieces.append(' ')
+                last = offset + position
+        if not pieces:
+            return text
+        pieces.append(text[last:])
+        return ''.join(pieces)
+
+    def apply_sequential(self, text):
+        """Run one re.sub per ordered word pair (the reference path)"""
+        for word1 in self.words:
+            for word2 in self.words:
+                if word1 != word2:
+                    text = re.sub(f"({word1})({word2})", r"\1 \2", text, flags=re.IGNORECASE)
+        return text
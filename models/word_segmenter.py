@@ -0,0 +1,234 @@
+import math
+import os
+import re
+from functools import lru_cache
+
+# Bundled unigram table: "word<TAB>count" lines, '#' lines are comments
+UNIGRAMS_PATH = os.path.join(os.path.dirname(__file__), 'data', 'unigrams.txt')
+
+# Longest dictionary word considered when splitting a token
+MAX_WORD_LENGTH = 24
+
+# Endings that turn a dictionary word into another real word
+_INFLECTIONS = (
+    's', 'es', 'ed', 'd', 'ing', 'er', 'ers', 'est', 'ly', 'ally', 'al',
+    'able', 'ness', 'ment', 'less', 'ful', 'ity'
+)
+
+# Words of one or two letters allowed as a piece of a split
+_SHORT_WORDS = {
+    'a', 'i', 'am', 'an', 'as', 'at', 'be', 'by', 'do', 'go', 'he', 'if', 'in',
+    'is', 'it', 'me', 'my', 'no', 'of', 'on', 'or', 'so', 'to', 'up', 'us', 'we'
+}
+
+# Single letters allowed as a piece, as written in the token ("Kashmiri" is
+# not "Kashmir i")
+_SINGLE_LETTERS = {'a', 'A', 'I'}
+
+# Corpus count a piece of a split of up to SHORT_PIECE_LENGTH letters needs;
+# rare short entries such as "oca" or "keno" fit inside almost any unknown word
+MIN_PIECE_COUNT = 10000000
+SHORT_PIECE_LENGTH = 4
+
+# Score of a token kept whole: an unknown word of log10 probability
+# UNKNOWN_LOG_PROB, less UNKNOWN_LETTER_PENALTY per letter. A split is only
+# accepted if its score beats that by SPLIT_MARGIN
+UNKNOWN_LOG_PROB = -6.0
+UNKNOWN_LETTER_PENALTY = 0.75
+SPLIT_MARGIN = 2.0
+
+# Capitalized tokens are mostly names; without a lowercase-to-uppercase
+# seam only ones at least this long are taken to be glued
+TITLE_GLUE_LENGTH = 12
+
+# Lowercase letter followed by an uppercase one, as in "HyperledgerFabric"
+_SEAM = re.compile(r'(?<=[a-z])(?=[A-Z])')
+
+
+class WordSegmenter:
+    """Split run-together words using unigram frequencies and dynamic programming"""
+
+    def __init__(self, counts, min_length=6, cache_size=65536):
+        """
+        Args:
+            counts (dict): Lowercase word -> corpus count
+            min_length (int): Shortest token considered for splitting
+            cache_size (int): Number of tokens whose split is memoized
+        """
+        total = float(sum(counts.values()))
+        self.log_probs = {word: math.log10(count / total) for word, count in counts.items()}
+        self.log_total = math.log10(total)
+        self.min_piece_log_prob = math.log10(MIN_PIECE_COUNT / total)
+        self.min_length = min_length
+        self.max_word_length = min(MAX_WORD_LENGTH, max(len(word) for word in counts))
+        self._token = re.compile(r'\b[A-Za-z]{%d,}\b' % min_length)
+
+        # Tokens repeat throughout a document, so both the raw segmentation
+        # and the per-token decision are memoized
+        self.segment = lru_cache(maxsize=cache_size)(self._segment)
+        self.split_token = lru_cache(maxsize=cache_size)(self._split_token)
+
+    @staticmethod
+    def load_counts(path=UNIGRAMS_PATH):
+        """
+        Read a unigram table
+
+        Args:
+            path (str): File with one "word<TAB>count" entry per line
+
+        Returns:
+            dict: Lowercase word -> count
+        """
+        counts = {}
+        with open(path, encoding='utf-8') as file:
+            for line in file:
+                if not line.strip() or line.startswith('#'):
+                    continue
+                word, count = line.split('\t')
+                counts[word.lower()] = counts.get(word.lower(), 0) + int(count)
+        return counts
+
+    def is_word(self, word):
+        """Whether word (any case) is in the table, directly or inflected"""
+        word = word.lower()
+        if word in self.log_probs:
+            return True
+        for ending in _INFLECTIONS:
+            stem = word[:-len(ending)]
+            if not word.endswith(ending) or len(stem) < 3:
+                continue
+            # Also undo a doubled final consonant, as in "debugged"
+            if stem in self.log_probs or (stem[-1] == stem[-2] and stem[:-1] in self.log_probs):
+                return True
+        return False
+
+    def _word_score(self, word):
+        """log10 probability of a word, with unknown words penalized by length"""
+        score = self.log_probs.get(word)
+        if score is None:
+            return 1 - self.log_total - len(word)
+        return score
+
+    def _segment(self, token):
+        """
+        Most likely split of a lowercase token into words
+
+        Viterbi over character positions: best[i] is the best score of any
+        split of token[:i], so the work is linear in the token length.
+
+        Returns:
+            tuple: The words, in order
+        """
+        best = [0.0] + [-math.inf] * len(token)
+        back = [0] * (len(token) + 1)
+        for end in range(1, len(token) + 1):
+            for start in range(max(0, end - self.max_word_length), end):
+                score = best[start] + self._word_score(token[start:end])
+                if score > best[end]:
+                    best[end] = score
+                    back[end] = start
+
+        words = []
+        end = len(token)
+        while end > 0:
+            words.append(token[back[end]:end])
+            end = back[end]
+        return tuple(reversed(words))
+
+    def looks_glued(self, token):
+        """
+        Whether token is worth segmenting
+
+        Only long tokens that are not words qualify: all-lowercase ones, and
+        capitalized ones that are very long or have a lowercase-to-uppercase
+        seam. Other capitalized tokens are usually names ("Telangana");
+        acronyms and camelCase are left to the other cleanup rules.
+        """
+        if len(token) < self.min_length or not token.isalpha() or not token.isascii():
+            return False
+        if token.islower():
+            glued = True
+        elif token[0].isupper() and token[1:2].islower():
+            glued = len(token) >= TITLE_GLUE_LENGTH or _SEAM.search(token) is not None
+        else:
+            glued = False
+        return glued and not self.is_word(token)
+
+    def _accept_split(self, token, words):
+        """
+        Whether splitting token into words is clearly better than keeping it
+
+        Every piece must be a common enough word (single letters only "a" and
+        "I", one or two letters only function words), any case seam must fall
+        between pieces, and the split must outscore the token read as one
+        unknown word by SPLIT_MARGIN.
+        """
+        if len(words) < 2:
+            return False
+
+        pieces = []
+        boundaries = set()
+        start = 0
+        for word in words:
+            pieces.append(token[start:start + len(word)])
+            start += len(word)
+            boundaries.add(start)
+
+        for word, piece in zip(words, pieces):
+            if word not in self.log_probs:
+                return False
+            if len(word) <= SHORT_PIECE_LENGTH and self.log_probs[word] < self.min_piece_log_prob:
+                return False
+            if len(word) == 1 and piece not in _SINGLE_LETTERS:
+                return False
+            if len(word) == 2 and word not in _SHORT_WORDS:
+                return False
+        if any(len(left) == 1 and len(right) == 1 for left, right in zip(words, words[1:])):
+            return False
+
+        if any(seam.start() not in boundaries for seam in _SEAM.finditer(token)):
+            return False
+
+        unsplit = UNKNOWN_LOG_PROB - UNKNOWN_LETTER_PENALTY * len(token)
+        return sum(self.log_probs[word] for word in words) > unsplit + SPLIT_MARGIN
+
+    def _split_token(self, token):
+        """Token with spaces between its words, or unchanged if it is not glued"""
+        if not self.looks_glued(token):
+            return token
+
+        words = self.segment(token.lower())
+        if not self._accept_split(token, words):
+            return token
+
+        # Cut the original token so its capitalization is kept
+        pieces = []
+        start = 0
+        for word in words:
+            pieces.append(token[start:start + len(word)])
+            start += len(word)
+        return ' '.join(pieces)
+
+    def split_glued(self, text):
+        """
+        Insert spaces inside every glued token in text
+
+        Args:
+            text (str): Text to fix
+
+        Returns:
+            str: Text with glued tokens split into words
+        """
+        if not text:
+            return text
+        return self._token.sub(lambda match: self.split_token(match.group(0)), text)
+
+    def cache_info(self):
+        """Hit and miss counters of the token memo"""
+        return self.split_token.cache_info()
+
+
+@lru_cache(maxsize=None)
+def default_segmenter():
+    """Shared WordSegmenter built from the bundled unigram table"""
+    return WordSegmenter(WordSegmenter.load_counts())
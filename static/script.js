@@ -45,6 +45,12 @@ document.addEventListener('DOMContentLoaded', function() {
         }
         formData.append('length', selectedLength);
         
+        // Get selected sentence selection mode
+        const modeOption = document.querySelector('input[name="summary_mode"]:checked');
+        if (modeOption) {
+            formData.append('summary_mode', modeOption.value);
+        }
+        
         // Get target language if selected
         const targetLanguage = document.getElementById('target-language').value;
         if (targetLanguage) {
@@ -0,0 +1,29 @@
+from models.cleanliness import CleanlinessDetector, SAMPLE_CHARS
+from models.text_utils import TextUtils
+
+PROSE = (
+    "Blockchain is a distributed system where transaction records are bundled in blocks "
+    "and linked with previous blocks. Each node keeps a copy of the shared ledger. "
+)
+
+
+def test_sample_keeps_windows_without_spaces():
+    text = "decentralizedsystems." * (2 * SAMPLE_CHARS // 21)
+    sample = CleanlinessDetector.sample(text)
+    assert len(sample) >= SAMPLE_CHARS // 2
+
+
+def test_fully_glued_long_text_gets_full_cleanup():
+    text = PROSE.replace(" ", "") * (5 * SAMPLE_CHARS // len(PROSE))
+    assert len(text) > SAMPLE_CHARS
+    assert CleanlinessDetector.choose_profile(text) == 'full'
+
+
+def test_clean_long_text_needs_no_cleanup():
+    text = PROSE * (5 * SAMPLE_CHARS // len(PROSE))
+    assert CleanlinessDetector.choose_profile(text) == 'none'
+
+
+def test_none_profile_still_collapses_whitespace():
+    text, profile = TextUtils.clean_extracted_text("A clean\n\n\tline.  Next one.\n", profile='none')
+    assert (text, profile) == ("A clean line. Next one.", 'none')
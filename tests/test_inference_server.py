@@ -0,0 +1,96 @@
+import threading
+import time
+import pytest
+from models.inference_server import InferenceServer
+
+
+class Recorder:
+    """run_batch stand-in that records its calls and can hold the first one"""
+
+    def __init__(self, hold_first=False):
+        self.calls = []
+        self.release = threading.Event()
+        self.started = threading.Event()
+        if not hold_first:
+            self.release.set()
+
+    def __call__(self, texts, **settings):
+        self.calls.append((list(texts), settings))
+        self.started.set()
+        self.release.wait(5)
+        return [text.upper() for text in texts]
+
+
+def test_batches_only_requests_with_equal_settings():
+    run_batch = Recorder(hold_first=True)
+    server = InferenceServer(run_batch, max_batch_size=8, max_wait=0.05)
+    first = server.submit('first', max_length=10)
+    assert run_batch.started.wait(5)
+
+    # Queued while the first batch runs, so the next batches see all of them
+    futures = [server.submit('a', max_length=10), server.submit('b', max_length=20),
+               server.submit('c', max_length=10), server.submit('d', max_length=20)]
+    run_batch.release.set()
+
+    assert [future.result(5) for future in futures] == ['A', 'B', 'C', 'D']
+    assert first.result(5) == 'FIRST'
+    assert run_batch.calls[1:] == [(['a', 'c'], {'max_length': 10}), (['b', 'd'], {'max_length': 20})]
+    server.close()
+
+
+def test_requests_join_a_batch_until_its_deadline():
+    run_batch = Recorder()
+    server = InferenceServer(run_batch, max_wait=0.05)
+    future = server.submit('solo')
+    time.sleep(0.01)
+    late = server.submit('late')
+
+    assert future.result(5) == 'SOLO'
+    assert late.result(5) == 'LATE'
+    assert run_batch.calls == [(['solo', 'late'], {})]
+
+    # Arriving after the deadline starts a new batch
+    server.submit('one').result(5)
+    time.sleep(0.1)
+    server.submit('two').result(5)
+    assert run_batch.calls[1:] == [(['one'], {}), (['two'], {})]
+    server.close()
+
+
+def test_run_batch_exception_reaches_every_caller():
+    def fail(texts, **settings):
+        raise ValueError("model failed")
+
+    server = InferenceServer(fail, max_wait=0.02)
+    futures = [server.submit('a'), server.submit('b')]
+    for future in futures:
+        with pytest.raises(ValueError, match="model failed"):
+            future.result(5)
+    server.close()
+
+
+def test_short_result_list_fails_the_whole_batch():
+    server = InferenceServer(lambda texts, **settings: texts[:1], max_wait=0.02)
+    futures = [server.submit('a'), server.submit('b')]
+    for future in futures:
+        with pytest.raises(RuntimeError, match="1 results for 2 texts"):
+            future.result(5)
+    server.close()
+
+
+def test_close_runs_queued_requests_first():
+    run_batch = Recorder(hold_first=True)
+    server = InferenceServer(run_batch, max_batch_size=2, max_wait=0.01)
+    futures = [server.submit('first')]
+    assert run_batch.started.wait(5)
+    futures += [server.submit(text) for text in 'abcde']
+
+    closer = threading.Thread(target=server.close)
+    closer.start()
+    run_batch.release.set()
+    closer.join(5)
+
+    assert not closer.is_alive()
+    assert all(future.done() for future in futures)
+    assert [future.result() for future in futures] == ['FIRST', 'A', 'B', 'C', 'D', 'E']
+    assert server.stats()['requests'] == 6
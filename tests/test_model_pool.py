@@ -0,0 +1,84 @@
+import threading
+import time
+from models import model_pool
+from models.model_pool import ModelPool, DEFAULT_MODEL_MB
+
+
+class FakeLoader:
+    """Loader that counts loads per name and can be slowed down"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.loads = []
+
+    def __call__(self, name):
+        self.loads.append(name)
+        time.sleep(self.delay)
+        return f"model:{name}"
+
+
+def _pool(monkeypatch, budget_mb, sizes, delay=0.0):
+    # Without a readable resident size the pool sums its recorded sizes,
+    # so the arithmetic does not depend on this process
+    monkeypatch.setattr(model_pool, '_rss_mb', lambda: None)
+    loader = FakeLoader(delay)
+    return ModelPool(loader, memory_budget_mb=budget_mb, size_estimates=sizes), loader
+
+
+def test_evicts_least_recently_used_first(monkeypatch):
+    pool, loader = _pool(monkeypatch, 300, {'a': 100, 'b': 100, 'c': 100, 'd': 100})
+    pool.get('a')
+    pool.get('b')
+    pool.get('c')
+    pool.get('a')  # 'b' is now least recently used
+    pool.get('d')
+
+    assert pool.loaded() == ['c', 'a', 'd']
+    assert pool.stats()['evictions'] == 1
+    assert loader.loads == ['a', 'b', 'c', 'd']
+
+
+def test_evicts_only_enough_for_the_new_model(monkeypatch):
+    pool, _ = _pool(monkeypatch, 1000, {'small': 200, 'medium': 300, 'large': 700})
+    pool.get('small')
+    pool.get('medium')
+
+    # 500 MB loaded + 700 needed is 200 over: evicting 'small' is enough
+    pool.get('large')
+    assert pool.loaded() == ['medium', 'large']
+
+
+def test_unknown_model_counts_default_size(monkeypatch):
+    pool, _ = _pool(monkeypatch, DEFAULT_MODEL_MB + 100, {'a': 100})
+    pool.get('a')
+    pool.get('unknown')
+    assert pool.loaded() == ['a', 'unknown']
+
+    pool.get('other')
+    assert pool.loaded() == ['other']
+
+
+def test_concurrent_gets_load_once(monkeypatch):
+    pool, loader = _pool(monkeypatch, 1000, {'a': 100}, delay=0.05)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(pool.get('a'))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert loader.loads == ['a']
+    assert results == ['model:a'] * 8
+    assert pool.stats()['loads'] == 1
+
+
+def test_evictions_are_credited_when_resident_memory_stays_up(monkeypatch):
+    pool, _ = _pool(monkeypatch, 1000, {'a': 250, 'b': 250, 'c': 300})
+    pool.get('a')
+    pool.get('b')
+
+    # Freed memory is often kept by the allocator, so resident memory does
+    # not drop after an eviction; 900 + 300 - 250 fits after evicting 'a'
+    monkeypatch.setattr(model_pool, '_rss_mb', lambda: 900)
+    pool.get('c')
+    assert pool.loaded() == ['b', 'c']
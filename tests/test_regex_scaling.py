@@ -0,0 +1,5 @@
+from benchmarks.bench_regex_scaling import check_scaling
+
+
+def test_cleaners_scale_linearly():
+    assert check_scaling(16, verbose=False) == []
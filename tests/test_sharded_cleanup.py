@@ -0,0 +1,30 @@
+from models.text_utils import TextUtils
+from models.general_formatter import GeneralFormatter
+from models.document import Document
+from models.sharded_cleanup import STREAM_SHARD_CHARS
+
+TEXT = (
+    "Blockchainis a distributedsystem.Each node keeps a copy  of the ledger,\n"
+    "and transactionsare bundled in blocks linked to previous blocks. \n\n"
+) * 1500
+
+
+def _pages(text, size=997):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_streamed_cleanup_matches_whole_text():
+    assert len(TEXT) > 2 * STREAM_SHARD_CHARS
+    for profile in ('full', 'light', 'none'):
+        streamed = "".join(TextUtils.iter_clean(_pages(TEXT), profile))
+        assert streamed == TextUtils.clean_extracted_text(TEXT, profile=profile)[0]
+
+
+def test_streamed_formatting_matches_whole_text():
+    assert "".join(GeneralFormatter.iter_format(_pages(TEXT))) == GeneralFormatter.format_text(TEXT)
+
+
+def test_keywords_counted_from_streamed_pieces():
+    cleaned = TextUtils.clean_extracted_text(TEXT, profile='full')[0]
+    streamed = TextUtils.extract_keywords(TextUtils.iter_clean(_pages(TEXT), 'full'))
+    assert streamed == TextUtils.extract_keywords(Document(cleaned))
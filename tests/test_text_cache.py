@@ -0,0 +1,39 @@
+import os
+from models.text_cache import TextCache
+from models.pdf_utils import PDFUtils
+
+
+def _entry_size(cache, key):
+    return os.path.getsize(os.path.join(cache.cache_dir, key + '.json.z'))
+
+
+def test_evicts_least_recently_used_first(tmp_path):
+    cache = TextCache(str(tmp_path))
+    cache.put('a', {'text': 'a' * 100})
+    size = _entry_size(cache, 'a')
+    cache.max_bytes = 2 * size
+    cache.put('b', {'text': 'b' * 100})
+    cache.get('a')
+    cache.put('c', {'text': 'c' * 100})
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.get('c') is not None
+    assert cache.stats()['evictions'] == 1
+
+
+def test_running_total_survives_overwrites_and_restarts(tmp_path):
+    cache = TextCache(str(tmp_path))
+    cache.put('a', {'text': 'a' * 100})
+    cache.put('a', {'text': 'a' * 100})
+    cache.put('b', {'text': 'b' * 100})
+    assert cache._total == _entry_size(cache, 'a') + _entry_size(cache, 'b')
+
+    reopened = TextCache(str(tmp_path))
+    assert reopened._total == cache._total
+
+
+def test_cache_key_separates_profiles():
+    digest = TextCache.digest(b'%PDF-1.4')
+    assert PDFUtils.cache_key(digest, 'full') != PDFUtils.cache_key(digest, 'none')
+    assert PDFUtils.cache_key(digest, 'auto').startswith(digest)
@@ -0,0 +1,51 @@
+import pytest
+from models.blockchain_formatter import BlockchainFormatter
+from models.general_formatter import GeneralFormatter
+from models.text_utils import TextUtils
+from models.word_segmenter import default_segmenter
+
+# Real words and names the segmenter has no entry for
+UNKNOWN_WORDS = [
+    "cryptographically",
+    "geolocation",
+    "Telangana",
+    "Dogecoin",
+    "tokenomics",
+    "Zimbabwean",
+    "Kashmiri",
+]
+
+
+@pytest.mark.parametrize("word", UNKNOWN_WORDS)
+def test_unknown_words_are_not_split(word):
+    assert default_segmenter().split_glued(word) == word
+
+
+@pytest.mark.parametrize("word", UNKNOWN_WORDS)
+def test_formatters_keep_unknown_words(word):
+    text = f"The report on {word} was published."
+    assert TextUtils.fix_spacing(text) == text
+    assert BlockchainFormatter.format_text(text) == text
+    assert GeneralFormatter.format_text(text) == text
+
+
+@pytest.mark.parametrize("token, expected", [
+    ("decentralizedsystems", "decentralized systems"),
+    ("andtransmitsthetransaction", "and transmits the transaction"),
+    ("Committedtransactionsareimmutable", "Committed transactions are immutable"),
+    ("HyperledgerFabric", "Hyperledger Fabric"),
+])
+def test_glued_words_are_split(token, expected):
+    assert default_segmenter().split_glued(token) == expected
+
+
+def test_split_must_follow_case_seam():
+    assert default_segmenter().split_glued("McDonald") == "McDonald"
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Thetopology of the network", "The topology of the network"),
+    ("Itmaybeanyexisting application", "It may be any existing application"),
+])
+def test_fix_spacing_keeps_literal_patterns(text, expected):
+    assert TextUtils.fix_spacing(text) == expected